@@ -1,15 +1,25 @@
 import sys
 
-from PyQt6.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QListWidget,
-                             QListWidgetItem, QStackedWidget, QApplication)
-from PyQt6.QtCore import QSize
-from PyQt6.QtGui import QIcon
+from startup_timing import timing
+from single_instance import SingleInstance, request_from_args
 
-from pomodoro_screen import PomodoroWidget
-from task_screen import TasksWidget
-from urgency_screen import UrgencyWidget
+if __name__ == "__main__":
+    # 既に起動しているなら、画面を作らずに頼みたいことを渡してすぐ終わる。
+    # QtWidgets やタスクの読み込みより前に行う
+    request = request_from_args(sys.argv[1:])
+    instance = SingleInstance()
+    if not instance.acquire():
+        sys.exit(0 if instance.forward(request) else 1)
+    timing.mark("single instance")
+
+from PyQt6.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QListWidget,  # noqa: E402
+                             QListWidgetItem, QStackedWidget, QApplication)
+from PyQt6.QtCore import QEvent, QSize, QSettings, QTimer  # noqa: E402
+from PyQt6.QtGui import QIcon  # noqa: E402
 
-from utils import resource_path
+from repository import get_repository  # noqa: E402
+from storage import get_store, import_legacy_settings  # noqa: E402
+from utils import resource_path  # noqa: E402
 
 
 class MainWindow(QMainWindow):
@@ -31,7 +41,8 @@ class MainWindow(QMainWindow):
         menu_items = [
             (resource_path("img/pomodoro.png"), "ポモドーロ"),
             (resource_path("img/tasks.png"), "タスク"),
-            (resource_path("img/matrix.png"), "マトリックス")
+            (resource_path("img/matrix.png"), "マトリックス"),
+            (resource_path("img/stats.png"), "統計")
         ]
 
         for icon_path, text in menu_items:
@@ -43,29 +54,133 @@ class MainWindow(QMainWindow):
             self.nav.addItem(item)
         main_layout.addWidget(self.nav)
 
-        # ウィジェットを作成して参照を保持
-        self.pomodoro_widget = PomodoroWidget()
-        self.tasks_widget = TasksWidget()
-        self.urgency_widget = UrgencyWidget()
+        # 旧バージョンの QSettings に残っているタスクを一度だけ取り込む
+        import_legacy_settings(get_store(),
+                               QSettings("CHU1PC", "TaskManagerApp"))
+
+        timing.mark("legacy import")
+
+        # 各画面は最初に開いたときに作る。それまではただの空ページを置いておく
+        self.pomodoro_widget = None
+        self.tasks_widget = None
+        self.urgency_widget = None
+        self.stats_widget = None
 
         self.stack = QStackedWidget()
-        self.stack.addWidget(self.pomodoro_widget)
-        self.stack.addWidget(self.tasks_widget)
-        self.stack.addWidget(self.urgency_widget)
+        for _ in self.SCREENS:
+            self.stack.addWidget(QWidget())
 
         main_layout.addWidget(self.stack, stretch=1)
 
         self.nav.currentRowChanged.connect(self.reset_urgency)
         self.nav.setCurrentRow(0)
+        timing.mark("main window")
+
+        # 最初の描画を待って起動時間を出す
+        self._first_paint = False
+        self.installEventFilter(self)
+
+    # nav の行 -> (画面の属性名, 画面を作る関数)
+    # 使わない画面の import (QtMultimedia など) も起動時には行わない
+    SCREENS = [
+        ("pomodoro_widget", "_create_pomodoro"),
+        ("tasks_widget", "_create_tasks"),
+        ("urgency_widget", "_create_urgency"),
+        ("stats_widget", "_create_stats"),
+    ]
+
+    @staticmethod
+    def _create_pomodoro():
+        from pomodoro_screen import PomodoroWidget
+        return PomodoroWidget()
+
+    @staticmethod
+    def _create_tasks():
+        from task_screen import TasksWidget
+        return TasksWidget()
+
+    @staticmethod
+    def _create_urgency():
+        from urgency_screen import UrgencyWidget
+        return UrgencyWidget()
+
+    @staticmethod
+    def _create_stats():
+        from stats_screen import StatsWidget
+        return StatsWidget()
+
+    def _ensure_screen(self, row):
+        """row 番目の画面がまだ無ければ作って空ページと入れ替える"""
+        name, factory = self.SCREENS[row]
+        widget = getattr(self, name)
+        if widget is not None:
+            return widget
+
+        with timing.measure(name):
+            widget = getattr(self, factory)()
+        placeholder = self.stack.widget(row)
+        self.stack.insertWidget(row, widget)
+        self.stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        setattr(self, name, widget)
+        return widget
+
+    def eventFilter(self, obj, event):
+        if (obj is self and not self._first_paint
+                and event.type() == QEvent.Type.Paint):
+            self._first_paint = True
+            timing.mark("first paint")
+            timing.write_report()
+            # トレイへの登録は描画を待たせないよう、描き終わってから行う
+            QTimer.singleShot(0, self._after_first_paint)
+        return super().eventFilter(obj, event)
+
+    def _after_first_paint(self):
+        if self.pomodoro_widget is not None:
+            self.pomodoro_widget.show_tray_icons()
+
+    def changeEvent(self, event):
+        # taskmanager.py などで書き換えられていたら、戻ってきたときに読み直す
+        if (event.type() == QEvent.Type.ActivationChange
+                and self.isActiveWindow()):
+            get_repository().reload_if_changed()
+        super().changeEvent(event)
+
+    def closeEvent(self, event):
+        # 閉じる前に遅延している書き込みを反映する
+        get_repository().flush()
+        super().closeEvent(event)
 
     def reset_urgency(self, current_row):
+        if current_row < 0:
+            return
+        self._ensure_screen(current_row)
+        # マトリックスは表示されたときに自分で変更を反映する (showEvent)
         self.stack.setCurrentIndex(current_row)
-        if current_row == 2:
-            self.urgency_widget.refresh_tasks()
+
+    def handle_request(self, request):
+        """後から起動されたアプリから渡された頼みを処理する"""
+        if request.get("command") == "add":
+            text = (request.get("text") or "").strip()
+            if text:
+                get_repository().add_task(text,
+                                          request.get("urgency") or "normal")
+            return
+        if self.isMinimized():
+            self.showNormal()
+        self.show()
+        self.raise_()
+        self.activateWindow()
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     win = MainWindow()
     win.show()
+    instance.listen(win.handle_request)
+    # 最初の起動に --add が付いていたときは、渡す相手がいないのでここで追加する
+    if request["command"] == "add":
+        win.handle_request(request)
+    app.aboutToQuit.connect(instance.release)
+    app.aboutToQuit.connect(get_repository().flush)
     sys.exit(app.exec())
@@ -0,0 +1,42 @@
+import time
+
+
+class MonotonicClock:
+    """
+    実際の時計。
+    残り時間は monotonic（スリープや時刻合わせで戻らない）で数え、
+    記録に残す開始・終了時刻は wall（UNIX 時間）を使う。
+    """
+    def monotonic(self):
+        return time.monotonic()
+
+    def wall(self):
+        return time.time()
+
+
+class VirtualClock:
+    """
+    advance() した分だけ進む仮想の時計。
+    テストやベンチマークで、何日分ものポモドーロを一瞬で進めるために使う。
+    """
+    def __init__(self, wall=0.0):
+        self._monotonic = 0.0
+        self._wall = float(wall)
+
+    def monotonic(self):
+        return self._monotonic
+
+    def wall(self):
+        return self._wall
+
+    def advance(self, seconds):
+        """seconds 秒進める"""
+        self._monotonic += seconds
+        self._wall += seconds
+
+    def sleep(self, seconds):
+        """
+        seconds 秒スリープしたことにする。
+        Linux などの monotonic と同じく、スリープ中は wall だけが進む。
+        """
+        self._wall += seconds
@@ -0,0 +1,44 @@
+class PhaseJournal:
+    """
+    実行中のフェーズ（開始時刻・終了時刻・タスク・フェーズ）を
+    ストアの1行に書いておく記録。
+
+    エンジンの状態が変わるたびに書き直し、フェーズが終われば消す。
+    アプリが落ちたりスリープしたりしても、次に起動したときに resume() で
+    続きから再開するか、終了時刻を過ぎていればその時刻で記録を締める。
+    読むのは1行だけなので、過去の記録の量によらず一瞬で終わる。
+    """
+    def __init__(self, engine, store):
+        self.engine = engine
+        self.store = store
+        self._resuming = False
+        engine.add_listener(self._on_event)
+
+    def resume(self):
+        """
+        保存されているフェーズがあればエンジンを続きから動かす。
+
+        Returns:
+            bool: 再開（または記録を締めた）なら True
+        """
+        snapshot = self.store.load_running_phase()
+        if snapshot is None:
+            return False
+        self._resuming = True
+        try:
+            self.engine.restore(snapshot)
+        finally:
+            self._resuming = False
+        self._save()
+        return True
+
+    def _on_event(self, event, data):
+        # 復元の途中は書き戻さない（終わってから1回だけ書く）
+        if not self._resuming:
+            self._save()
+
+    def _save(self):
+        if self.engine.in_progress():
+            self.store.save_running_phase(self.engine.snapshot())
+        else:
+            self.store.clear_running_phase()
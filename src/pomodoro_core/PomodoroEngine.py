@@ -0,0 +1,276 @@
+from .Clock import MonotonicClock
+
+
+# フェーズ
+WORK = "work"
+BREAK = "break"
+
+# フェーズの終わり方
+COMPLETED = "completed"  # 時間どおりに終わった
+SKIPPED = "skipped"      # スキップした
+STOPPED = "stopped"      # リセットで止めた（フェーズは切り替えない）
+
+# monotonic に比べて wall がこれ以上進んでいたら、スリープしていたとみなす
+# (Linux などの monotonic はスリープ中に進まないため)
+SLEEP_THRESHOLD = 2.0
+
+# 終了時刻をこれ以上過ぎてから気づいたときは、その間は誰も見ていなかったとみなし
+# 次のフェーズを自動で始めない。画面が隠れている間のタイマーは粗く、負荷が高いと
+# 数秒遅れることもあるので、それよりずっと長くしておく
+OVERDUE_THRESHOLD = 60.0
+
+
+class PomodoroEngine:
+    """
+    ポモドーロの作業・休憩フェーズを進める状態機械。
+
+    GUI に依存せず、時間は注入された clock から読む。画面やタイマーは
+    add_listener() で登録した関数にイベントとして通知を受け取り、
+    時間が来たかどうかは update() を呼んで確かめてもらう。
+
+    イベント (名前, 内容):
+        phase_started  phase, duration(秒)
+        paused         phase, remaining(秒)
+        resumed        phase, remaining(秒)
+        phase_finished phase, start, end(UNIX 時間), seconds(実際に進んだ秒数),
+                       reason(COMPLETED / SKIPPED / STOPPED), task_id
+        restored       phase, remaining(秒), running
+        task_selected  task_id
+        reset
+    """
+    def __init__(self, clock=None, work_minutes=25, rest_minutes=5,
+                 auto_next=False, auto_break=False, sets_completed=0):
+        self.clock = clock or MonotonicClock()
+        self.work_minutes = work_minutes
+        self.rest_minutes = rest_minutes
+        self.auto_next = auto_next
+        self.auto_break = auto_break
+        self.sets_completed = sets_completed
+
+        self.phase = WORK
+        # 動いている間の終了時刻(monotonic)。止まっている間は None
+        self._deadline = None
+        # 止まっている間の残り秒数（0 ならフェーズは始まっていない）
+        self._remaining = 0.0
+        # 今のフェーズの長さ(秒)。進んだ時間は duration - remaining で分かる
+        self._duration = 0.0
+        # 今のフェーズを始めた時刻(UNIX 時間)
+        self._started_at = None
+        # 最後に時計を見たときの (monotonic, wall)。スリープの検出に使う
+        self._anchor = None
+        # 作業しているタスクの id（エンジンは中身を気にしない）
+        self.task_id = None
+
+        self._listeners = []
+
+    # -------------------------------------------------------------------------
+    # イベント
+    # -------------------------------------------------------------------------
+
+    def add_listener(self, callback):
+        """callback(event, data) でイベントを受け取る"""
+        self._listeners.append(callback)
+
+    def _emit(self, event, **data):
+        for callback in list(self._listeners):
+            callback(event, data)
+
+    # -------------------------------------------------------------------------
+    # 状態
+    # -------------------------------------------------------------------------
+
+    @property
+    def is_break(self):
+        return self.phase == BREAK
+
+    def is_running(self):
+        return self._deadline is not None
+
+    def phase_minutes(self, phase=None):
+        phase = phase or self.phase
+        return self.rest_minutes if phase == BREAK else self.work_minutes
+
+    def remaining(self):
+        """今のフェーズの残り秒数"""
+        if self._deadline is None:
+            return self._remaining
+        return max(0.0, self._deadline - self.clock.monotonic())
+
+    def in_progress(self):
+        """始めたフェーズが終わっていない（一時停止中も含む）か"""
+        return self._deadline is not None or self._remaining > 0
+
+    def snapshot(self):
+        """
+        途中のフェーズを保存するための辞書を返す。
+        時刻は再起動後も意味が変わらない UNIX 時間で持つ。
+        """
+        deadline = None
+        if self._deadline is not None:
+            deadline = self.clock.wall() + self.remaining()
+        return {
+            "phase": self.phase,
+            "running": self._deadline is not None,
+            "started_at": self._started_at,
+            "deadline": deadline,
+            "remaining": self.remaining(),
+            "duration": self._duration,
+            "task_id": self.task_id,
+        }
+
+    def restore(self, snapshot):
+        """
+        snapshot() で保存した途中のフェーズから続ける。
+        止まっている間に終了時刻を過ぎていれば、そのフェーズだけをその時刻で
+        終えた扱いにする（止まっている間に自動で続くはずだったフェーズは数えない）。
+        """
+        self.phase = snapshot["phase"]
+        self.task_id = snapshot.get("task_id")
+        self._started_at = snapshot.get("started_at")
+        self._duration = snapshot["duration"]
+        if snapshot["running"]:
+            remaining = snapshot["deadline"] - self.clock.wall()
+            self._set_deadline(self.clock.monotonic() + remaining)
+        else:
+            self._deadline = None
+            self._remaining = max(0.0, snapshot["remaining"])
+        self._emit("restored", phase=self.phase, remaining=self.remaining(),
+                   running=self.is_running())
+        self.update()
+
+    # -------------------------------------------------------------------------
+    # 操作
+    # -------------------------------------------------------------------------
+
+    def start(self):
+        """フェーズを始める。一時停止中なら続きから再開する"""
+        if self._deadline is not None:
+            return
+        if self._remaining <= 0:
+            self._start_phase(self.clock.monotonic())
+            return
+        self._set_deadline(self.clock.monotonic() + self._remaining)
+        self._emit("resumed", phase=self.phase, remaining=self._remaining)
+
+    def pause(self):
+        if self._deadline is None:
+            return
+        self._remaining = self.remaining()
+        self._deadline = None
+        self._emit("paused", phase=self.phase, remaining=self._remaining)
+
+    def elapsed(self):
+        """今のフェーズで実際に進んだ秒数（一時停止していた間は含まない）"""
+        if not self.in_progress():
+            return 0.0
+        return max(0.0, self._duration - self.remaining())
+
+    def skip(self):
+        """
+        始めたフェーズを今すぐ終える（一時停止中でも）。
+        そこまで進んだ分を SKIPPED として通知して、次のフェーズに切り替える。
+        """
+        if not self.in_progress():
+            return
+        elapsed = self.elapsed()
+        self._deadline = None
+        self._remaining = 0.0
+        self._finish_phase(self.clock.wall(), elapsed, SKIPPED)
+
+    def select_task(self, task_id):
+        """作業するタスクを変える"""
+        if task_id == self.task_id:
+            return
+        self.task_id = task_id
+        self._emit("task_selected", task_id=task_id)
+
+    def reset(self):
+        """
+        止めて作業フェーズに戻し、セット数も 0 にする。
+        途中のフェーズがあれば、そこまで進んだ分を STOPPED として通知する。
+        """
+        if self.in_progress():
+            self._emit("phase_finished", phase=self.phase,
+                       start=self._started_at, end=self.clock.wall(),
+                       seconds=self.elapsed(), reason=STOPPED,
+                       task_id=self.task_id)
+        self._deadline = None
+        self._remaining = 0.0
+        self._started_at = None
+        self.phase = WORK
+        self.sets_completed = 0
+        self._emit("reset")
+
+    def update(self):
+        """
+        時計を見て、終了時刻を過ぎたフェーズを終える。
+        自動開始で続くフェーズは前の終了時刻から始めるので、表示の更新が
+        少し遅れても時間はずれない。ただしスリープや再起動で終了時刻を
+        大きく過ぎていたときは、終えるのはそのフェーズだけにして次は自動で
+        始めない（誰もいない間に進んだはずのフェーズを記録しないため）。
+
+        Returns:
+            bool: フェーズが1つでも終わったら True
+        """
+        self._check_sleep()
+        finished = False
+        while (self._deadline is not None
+               and self.clock.monotonic() >= self._deadline):
+            deadline = self._deadline
+            end = self.clock.wall() - (self.clock.monotonic() - deadline)
+            self._deadline = None
+            self._remaining = 0.0
+            overdue = self.clock.monotonic() - deadline
+            self._finish_phase(end, self._duration, COMPLETED,
+                               next_start=deadline,
+                               auto=overdue <= OVERDUE_THRESHOLD)
+            finished = True
+        return finished
+
+    def _set_deadline(self, deadline):
+        self._deadline = deadline
+        self._anchor = (self.clock.monotonic(), self.clock.wall())
+
+    def _check_sleep(self):
+        """
+        前回から wall が monotonic より大きく進んでいたらスリープしていた。
+        スリープ中も実際の時間は過ぎているので、その分だけ終了時刻を早める。
+        """
+        if self._deadline is None or self._anchor is None:
+            return
+        monotonic, wall = self.clock.monotonic(), self.clock.wall()
+        drift = (wall - self._anchor[1]) - (monotonic - self._anchor[0])
+        if drift > SLEEP_THRESHOLD:
+            self._deadline -= drift
+        self._anchor = (monotonic, wall)
+
+    # -------------------------------------------------------------------------
+    # フェーズの切り替え
+    # -------------------------------------------------------------------------
+
+    def _start_phase(self, start):
+        duration = self.phase_minutes() * 60
+        self._duration = float(duration)
+        self._remaining = float(duration)
+        self._set_deadline(start + duration)
+        # 開始時刻は monotonic の start に当たる UNIX 時間
+        self._started_at = self.clock.wall() - (self.clock.monotonic() - start)
+        self._emit("phase_started", phase=self.phase, duration=duration)
+
+    def _finish_phase(self, end, seconds, reason, next_start=None, auto=True):
+        phase = self.phase
+        if phase == WORK:
+            self.sets_completed += 1
+        self.phase = WORK if phase == BREAK else BREAK
+        started_at = self._started_at
+        self._started_at = None
+        self._emit("phase_finished", phase=phase, start=started_at, end=end,
+                   seconds=seconds, reason=reason, task_id=self.task_id)
+
+        # 次のフェーズを自動で始める（時間通りに終わったなら前の終了時刻から）
+        if auto:
+            auto = self.auto_break if self.phase == BREAK else self.auto_next
+        if auto and self._deadline is None:
+            if next_start is None:
+                next_start = self.clock.monotonic()
+            self._start_phase(next_start)
@@ -0,0 +1,4 @@
+from .Clock import MonotonicClock, VirtualClock  # type: ignore # noqa
+from .PomodoroEngine import (PomodoroEngine, WORK, BREAK,  # type: ignore # noqa
+                             COMPLETED, SKIPPED, STOPPED)
+from .PhaseJournal import PhaseJournal  # type: ignore # noqa
\ No newline at end of file
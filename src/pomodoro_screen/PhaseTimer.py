@@ -0,0 +1,70 @@
+from PyQt6.QtCore import QObject, Qt, QTimer, pyqtSignal
+
+
+class PhaseTimer(QObject):
+    """
+    PomodoroEngine を実際の時間で動かす Qt 側のタイマー。
+
+    残り時間はエンジンが終了時刻(monotonic)から計算するので、tick が
+    遅れたり飛んだりしても時間がずれない。表示の秒が切り替わる瞬間だけ
+    CoarseTimer で起きて engine.update() を呼ぶので、100ms ごとに
+    起きていたころより起床回数がずっと少ない。
+
+    画面が見えていない間は秒ごとには起きず、終了時刻（長くても
+    HIDDEN_INTERVAL_MS ごと、スリープの検出のため）にだけ起きる。
+    見えるようになったら1回だけ描き直してから秒ごとの更新に戻る。
+    """
+    HIDDEN_INTERVAL_MS = 60 * 1000
+
+    # 表示の秒が変わったとき（残りミリ秒）
+    tick = pyqtSignal(int)
+
+    def __init__(self, engine, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.visible = True
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+
+        # 開始・停止などエンジンの状態が変わるたびに起きる時刻を決め直す
+        engine.add_listener(lambda event, data: self._schedule())
+
+    def remaining_ms(self):
+        return int(self.engine.remaining() * 1000)
+
+    def set_visible(self, visible):
+        """表示されているかどうかを切り替える"""
+        if visible == self.visible:
+            return
+        self.visible = visible
+        if visible and self.engine.is_running():
+            # 隠れている間に過ぎた分を1回で追いつく
+            self._on_timeout()
+        else:
+            self._schedule()
+
+    def _schedule(self):
+        if not self.engine.is_running():
+            self._timer.stop()
+            return
+        remaining = self.remaining_ms()
+        if not self.visible:
+            # 表示しないので終了時刻まで寝ておく（秒単位の精度で十分）
+            self._timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
+            self._timer.start(min(remaining, self.HIDDEN_INTERVAL_MS))
+            return
+        # 残りミリ秒が次に 1000 の倍数をまたぐ瞬間に起きる
+        self._timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self._timer.start(remaining % 1000 or (1000 if remaining else 0))
+
+    def _on_timeout(self):
+        # 時間が来ていればエンジンがフェーズを終え、イベントで次を予約する
+        if self.engine.update():
+            return
+        if self.engine.is_running():
+            if self.visible:
+                self.tick.emit(self.remaining_ms())
+            self._schedule()
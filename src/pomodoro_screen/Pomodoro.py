@@ -1,17 +1,19 @@
-import datetime
-
 from PyQt6.QtWidgets import (QDialog, QSpinBox, QVBoxLayout, QHBoxLayout,
                              QLabel, QWidget, QGridLayout, QPushButton,
                              QSizePolicy, QProgressBar, QFrame,
                              QSystemTrayIcon, QComboBox, QInputDialog
                              )
-from PyQt6.QtCore import Qt, QSettings, QTimer, QUrl
-from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
+from PyQt6.QtCore import Qt, QEvent, QSettings
 
 
-from utils import resource_path
+from pomodoro_core import (BREAK, COMPLETED, STOPPED, PhaseJournal,
+                           PomodoroEngine)
+from repository import get_repository
+from sound import get_audio
+from utils import format_seconds
 from .VolumeSetting import VolumeSettingDialog
 from .TimerSetting import TimerSettingDialog
+from .PhaseTimer import PhaseTimer
 
 
 class PomodoroWidget(QWidget):
@@ -36,52 +38,42 @@ class PomodoroWidget(QWidget):
         # 設定読み込み
         # ---------------------------------------------------------------------
 
-        # タスク設定と同じものを使用する
-        self.task_settings = QSettings("CHU1PC", "TaskManagerApp")
+        # タスク一覧と勉強時間は全画面で共有するリポジトリから読み書きする
+        self.repository = get_repository()
 
         # QsettingsでCHU1PC/PomodoroAppに保存する
         self.settings = QSettings("CHU1PC", "PomodoroApp")
 
-        # 1ポモドーロの時間を読み込む
-        self.default_minutes = int(self.settings.value("timer/minutes", 25))
-
-        # 休憩時間を読み込む
-        self.default_rest = int(self.settings.value("timer/rest", 5))
-
-        # ポモドーロの自動開始の有無を読み込む
-        self.auto_next = \
-            self.settings.value("timer/auto_next", False, type=bool)
-
-        # 休憩時間の自動開始の有無を読み込む
-        self.auto_break = \
-            self.settings.value("timer/auto_break", False, type=bool)
-
-        # 行ってセット数(ポモドーロの数)を読み込む
-        self.sets_completed = int(self.settings.value("history/total_sets", 0))
+        # フェーズの進行は GUI から切り離したエンジンが行う
+        self.engine = PomodoroEngine(
+            # 1ポモドーロの時間を読み込む
+            work_minutes=int(self.settings.value("timer/minutes", 25)),
+            # 休憩時間を読み込む
+            rest_minutes=int(self.settings.value("timer/rest", 5)),
+            # ポモドーロの自動開始の有無を読み込む
+            auto_next=self.settings.value("timer/auto_next", False,
+                                          type=bool),
+            # 休憩時間の自動開始の有無を読み込む
+            auto_break=self.settings.value("timer/auto_break", False,
+                                           type=bool),
+            # 行ってセット数(ポモドーロの数)を読み込む
+            sets_completed=int(self.settings.value("history/total_sets", 0)),
+        )
+        self.engine.add_listener(self._on_engine_event)
+        # 前回のフェーズを復元している間か（まだウィンドウが出ていない）
+        self._resuming = False
 
         # 目標時間を読み込む
-        self.goal_minutes = int(self.settings.value("goal/minutes",
-                                                    self.default_minutes * 4))
-
-        # ---------------------------------------------------------------------
-        # フェーズ管理
-        # ---------------------------------------------------------------------
-        self.is_break = False  # Falseの時は勉強時間
-        self.remaining_tenths = 0
-        self.total_tenths = 0
+        self.goal_minutes = int(self.settings.value(
+            "goal/minutes", self.engine.work_minutes * 4))
 
         # ---------------------------------------------------------------------
         # 通知用
         # ---------------------------------------------------------------------
-        self.study_announce = \
-            QSystemTrayIcon(self)
-        self.study_announce.setToolTip("Time Manager APP")
-        self.study_announce.setVisible(True)
-
-        self.rest_announce = \
-            QSystemTrayIcon(self)
-        self.rest_announce.setToolTip("Time Manager APP")
-        self.rest_announce.setVisible(True)
+        # トレイへの登録は最初の描画の後に show_tray_icons() で行う
+        # （それより前に通知するときはその場で作る）
+        self.study_announce = None
+        self.rest_announce = None
 
         # ---------------------------------------------------------------------
         # タイマー設定ボタン
@@ -146,10 +138,10 @@ class PomodoroWidget(QWidget):
         self.goal_spin = QSpinBox(self)
         self.goal_spin.setFixedSize(120, 30)
         # 目標時間はポモドーロの時間単位で設定できるようにしたいためrangeを設定する
-        self.goal_spin.setRange(self.default_minutes,
-                                self.default_minutes * 99)
+        self.goal_spin.setRange(self.engine.work_minutes,
+                                self.engine.work_minutes * 99)
         # setSingleStepで矢印が押されたときにどれだけ値が増減するかを決める
-        self.goal_spin.setSingleStep(self.default_minutes)
+        self.goal_spin.setSingleStep(self.engine.work_minutes)
         self.goal_spin.setValue(self.goal_minutes)
         self.goal_spin.setSuffix(" 分")
         self.goal_spin.valueChanged.connect(self._on_goal_changed)
@@ -223,7 +215,7 @@ class PomodoroWidget(QWidget):
 
         self.task_combo.addItem("タスクなし")
         self.task_combo.setStyleSheet("color: #ffffff;")
-        self.task_combo.currentTextChanged.connect(self._on_task_changed)
+        self.task_combo.currentIndexChanged.connect(self._on_task_changed)
 
         # タスク更新ボタン
         self.refresh_task_btn = QPushButton("更新")
@@ -258,6 +250,32 @@ class PomodoroWidget(QWidget):
             }
         """)
 
+        # 連続日数・直近の平均・自己ベスト（リポジトリが差分で保っている値を出すだけ）
+        metrics_label = QLabel("記録")
+        metrics_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        metrics_label.setStyleSheet("""
+            QWidget {
+                background-color: #222;
+                color: #ddd;
+                border-radius: 8px;
+                padding: 5px;
+            }
+        """)
+        self.streak_label = QLabel()
+        self.best_label = QLabel()
+        self.average_label = QLabel()
+        for label in (self.streak_label, self.best_label,
+                      self.average_label):
+            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            label.setStyleSheet("""
+                QWidget {
+                    background-color: #222;
+                    color: #ddd;
+                    border-radius: 8px;
+                    padding: 5px;
+                }
+            """)
+
         # タスク選択行
         task_select_layout = QHBoxLayout()
         task_select_layout.addWidget(self.task_combo, stretch=3)
@@ -266,7 +284,7 @@ class PomodoroWidget(QWidget):
         task_select_widget = QWidget()
         task_select_widget.setLayout(task_select_layout)
 
-        self.selected_task = None
+        self.selected_task_id = None
 
         # 画面への追加
         right_layout.addWidget(self.sets_label, 1, 0)
@@ -281,9 +299,19 @@ class PomodoroWidget(QWidget):
         right_layout.addWidget(task_label, 5, 0, 1, 2)
         right_layout.addWidget(task_select_widget, 6, 0, 1, 2)
         right_layout.addWidget(self.current_task_label, 7, 0, 1, 2)
+
+        right_layout.addWidget(metrics_label, 8, 0, 1, 2)
+        right_layout.addWidget(self.streak_label, 9, 0)
+        right_layout.addWidget(self.best_label, 9, 1)
+        right_layout.addWidget(self.average_label, 10, 0, 1, 2)
         right_layout.addLayout(header, 0, 0)
 
         self._refresh_tasks()
+        self.repository.task_added.connect(self._on_repo_task_added)
+        self.repository.task_changed.connect(self._on_repo_task_changed)
+        self.repository.task_removed.connect(self._on_repo_task_removed)
+        self.repository.tasks_reordered.connect(self._refresh_tasks)
+        self.repository.study_time_changed.connect(self._update_metrics)
         # _update_remainingで目標時間から残りの時間数とポモドーロ数を計算して表示させる
         self._update_remaining()
 
@@ -364,10 +392,12 @@ class PomodoroWidget(QWidget):
         """)
         btn_layout.addWidget(self.skip_btn)
 
-        # タイマー
-        self.timer = QTimer(self)
-        self.timer.setInterval(100)
-        self.timer.timeout.connect(self._update_timer)
+        # タイマー（終了時刻から残り時間を計算し、秒が変わるときだけ起きる）
+        self.timer = PhaseTimer(self.engine, self)
+        self.timer.tick.connect(self._update_timer)
+        # 表示されるまでは時間の表示を更新しない（showEvent で切り替える）
+        self.timer.set_visible(False)
+        self._watching_window = False
 
         # シグナル
         self.start_btn.clicked.connect(self._on_start_stop)
@@ -377,30 +407,9 @@ class PomodoroWidget(QWidget):
         self.settings_btn.clicked.connect(self._open_settings)
         self.volume_setting.clicked.connect(self._open_volume_settings)
 
-        # 終了音声
-        self.player = QMediaPlayer()
-        self.audio_output = QAudioOutput()
-        self.player.setAudioOutput(self.audio_output)
-
-        saved_volume = float(self.settings.value("audio/volume", 0.5))
-        self.audio_output.setVolume(saved_volume)
-        self.work_end_sound = \
-            QUrl.fromLocalFile(resource_path("audio/beep2.mp3"))
-        self.break_end_sound = \
-            QUrl.fromLocalFile(resource_path("audio/beep1.mp3"))
-        self.error_sound = \
-            QUrl.fromLocalFile(resource_path("audio/error.mp3"))
-
-        # 勉強中音声
-        self.bgm_player = QMediaPlayer()
-        self.bgm_audio_output = QAudioOutput()
-        self.bgm_player.setAudioOutput(self.bgm_audio_output)
-        self.bgm_player.setLoops(QMediaPlayer.Loops.Infinite)
-
-        saved_bgm_volume = float(self.settings.value("audio/bgm_volume", 0.2))
-        self.bgm_audio_output.setVolume(saved_bgm_volume)
-        self.bgm_player.setSource(
-            QUrl.fromLocalFile(resource_path("audio/clock.mp3")))
+        # 終了音声と勉強中音声（プレイヤーの準備は起動後に行う）
+        self.audio = get_audio()
+        self.audio.warm_up_later()
 
         left_layout.addLayout(volume_header)
         left_layout.addStretch()
@@ -426,19 +435,60 @@ class PomodoroWidget(QWidget):
 
         self._reset_display()
 
+        # 実行中のフェーズを記録しておき、前回落ちたりスリープしたりしていれば
+        # その続きから再開する（終了時刻を過ぎていればその時刻で記録する）
+        self.engine.select_task(self.selected_task_id)
+        self.journal = PhaseJournal(self.engine, self.repository.store)
+        self._resuming = True
+        try:
+            self.journal.resume()
+        finally:
+            self._resuming = False
+        if self.engine.is_running() and not self.engine.is_break:
+            self.audio.play_bgm()
+
+    # -------------------------------------------------------------------------
+    # 表示されていない間は時間の表示を止める
+    # -------------------------------------------------------------------------
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 最小化を知るためにウィンドウの状態変化も見ておく
+        window = self.window()
+        if window is not self and not self._watching_window:
+            window.installEventFilter(self)
+            self._watching_window = True
+        self._update_visibility()
+        # 日付が変わっていれば連続日数や平均も変わる
+        self._update_metrics()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_visibility()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._update_visibility()
+        return super().eventFilter(obj, event)
+
+    def _update_visibility(self):
+        """別のタブや最小化で見えていなければタイマーの表示更新を止める"""
+        visible = self.isVisible() and not self.window().isMinimized()
+        self.timer.set_visible(visible)
+
     def _skip_timer(self):
         """スキップボタンが押された際にtimerの時間を強制的に0にする
         """
-        self.remaining_tenths = 0
-        self.bgm_player.stop()
+        self.audio.stop_bgm()
+        self.engine.skip()
 
     def _open_volume_settings(self):
         """音量設定Widgetが開かれた時の処理
         """
 
         # 今現在のsfxとbgmの音量を取ってくる(0~1 → 0~100)
-        current_sfx_volume_per = int(self.audio_output.volume() * 100)
-        current_bgm_volume_per = int(self.bgm_audio_output.volume() * 100)
+        current_sfx_volume_per = int(self.audio.sfx_volume() * 100)
+        current_bgm_volume_per = int(self.audio.bgm_volume() * 100)
 
         dlg = VolumeSettingDialog(self,
                                   initial_bgm_volume=current_bgm_volume_per,
@@ -452,29 +502,25 @@ class PomodoroWidget(QWidget):
             new_sfx_volume_float = new_sfx_volume_per / 100.0  # %に変更する
             new_bgm_volume_float = new_bgm_volume_per / 100.0  # %に変更する
 
-            self.audio_output.setVolume(new_sfx_volume_float)
-            self.bgm_audio_output.setVolume(new_bgm_volume_float)
-
-            # settingsに書き込む
-            self.settings.setValue("audio/volume", new_sfx_volume_float)
-            self.settings.setValue("audio/bgm_volume", new_bgm_volume_float)
+            # 音量を変えて settings に書き込む
+            self.audio.set_volumes(new_sfx_volume_float, new_bgm_volume_float)
 
     def _open_settings(self):
         """ポモドーロの設定Widgetが開かれた時の処理
         """
         parent = self.window()
         dlg = TimerSettingDialog(parent,
-                                 self.default_minutes,
-                                 self.default_rest,
-                                 self.auto_next,
-                                 self.auto_break)
+                                 self.engine.work_minutes,
+                                 self.engine.rest_minutes,
+                                 self.engine.auto_next,
+                                 self.engine.auto_break)
         dlg.setModal(True)
         if dlg.exec() == QDialog.DialogCode.Accepted:
             m, r, auto_next, auto_break = dlg.values()
-            self.default_minutes = m
-            self.default_rest = r
-            self.auto_next = auto_next
-            self.auto_break = auto_break
+            self.engine.work_minutes = m
+            self.engine.rest_minutes = r
+            self.engine.auto_next = auto_next
+            self.engine.auto_break = auto_break
 
             # QSettingsにも書き込む
             self.settings.setValue("timer/minutes", m)
@@ -496,11 +542,12 @@ class PomodoroWidget(QWidget):
         self._update_remaining()
 
     def _update_remaining(self):
-        done = self.sets_completed * self.default_minutes
+        minutes = self.engine.work_minutes
+        done = self.engine.sets_completed * minutes
         remain = max(0, self.goal_minutes - done)
 
-        if self.default_minutes > 0:
-            need = (remain + self.default_minutes - 1) // self.default_minutes
+        if minutes > 0:
+            need = (remain + minutes - 1) // minutes
         else:
             need = 0
 
@@ -523,214 +570,320 @@ class PomodoroWidget(QWidget):
             }
         """)
 
+    def _update_metrics(self):
+        """連続日数・直近 7/30 日の平均・自己ベストを表示する"""
+        metrics = self.repository.metrics.snapshot()
+        self.streak_label.setText(
+            f"連続: {metrics['streak']}日\n(最長 {metrics['best_streak']}日)")
+        if metrics["best_day"]:
+            self.best_label.setText(
+                f"最高: {format_seconds(metrics['best_day_seconds'])}\n"
+                f"({metrics['best_day']})")
+        else:
+            self.best_label.setText("最高: -")
+        self.average_label.setText(
+            f"1日平均  直近7日: {format_seconds(metrics['average_7'])}"
+            f"  直近30日: {format_seconds(metrics['average_30'])}")
+
     def _on_start_stop(self):
         # タイマーの開始／停止
-        if not self.timer.isActive():
-            if self.remaining_tenths == 0:
-                self._start_phase()
-            self.timer.start()
+        if not self.engine.is_running():
+            self.engine.start()
             self.start_btn.setText("停止")
 
-            if not self.is_break:
-                self.bgm_player.play()
+            if not self.engine.is_break:
+                self.audio.play_bgm()
 
         else:
-            self.timer.stop()
+            self.engine.pause()
             self.start_btn.setText("再開")
 
-            self.bgm_player.pause()
+            self.audio.pause_bgm()
+
+    def show_tray_icons(self):
+        """通知用のトレイアイコンを作って表示する"""
+        if self.study_announce is not None:
+            return
+        self.study_announce = QSystemTrayIcon(self)
+        self.study_announce.setToolTip("Time Manager APP")
+        self.study_announce.setVisible(True)
+
+        self.rest_announce = QSystemTrayIcon(self)
+        self.rest_announce.setToolTip("Time Manager APP")
+        self.rest_announce.setVisible(True)
+
+    def _announce(self):
+        """通知に使うトレイアイコン（まだ無ければ作る）"""
+        self.show_tray_icons()
+        return self.study_announce
 
     def _on_reset(self):
         # リセット: タイマー停止、表示とセット数リセット
-        if self.timer.isActive():
-            self.timer.stop()
-        self.bgm_player.stop()
-        self.is_break = False
-        self.remaining_tenths = 0
-        self.sets_completed = 0
+        self.audio.stop_bgm()
+        self.engine.reset()
         self.settings.setValue("history/total_sets", 0)
         self._reset_display()
 
-    def _start_phase(self):
-        # 作業 or 休憩フェーズ開始
-        duration = self.default_rest if self.is_break else self.default_minutes
-        self.total_tenths = duration * 60 * 10
-        self.remaining_tenths = self.total_tenths
-        color = "green" if self.is_break else "white"
+    def _on_engine_event(self, event, data):
+        if event == "phase_started":
+            self._start_phase(data["duration"])
+        elif event == "phase_finished":
+            self._on_phase_finished(data)
+        elif event == "restored":
+            self._on_phase_restored(data)
+
+    def _on_phase_restored(self, data):
+        # 記録されていたタスクを選び直す
+        index = self.task_combo.findData(self.engine.task_id)
+        if index >= 0:
+            self.task_combo.setCurrentIndex(index)
+        self._start_phase(self.engine.phase_minutes() * 60)
+        self._update_timer(int(data["remaining"] * 1000))
+        self.start_btn.setText("停止" if data["running"] else "再開")
+
+    def _start_phase(self, duration):
+        # 作業 or 休憩フェーズ開始（duration は秒）
+        color = "green" if self.engine.is_break else "white"
         self.time_label.setStyleSheet(f"font-size:48px; color:{color};")
-        self.progress.setRange(0, self.total_tenths)
-        self.progress.setValue(self.total_tenths)
+        # プログレスバーは秒単位
+        self.progress.setRange(0, duration)
+        self.progress.setValue(duration)
         self.start_btn.setText("停止")
 
-    def _update_timer(self):
-        # カウントダウン処理
-        if self.remaining_tenths > 0:
-            self.remaining_tenths -= 1
-            sec = self.remaining_tenths // 10
-            m, s = divmod(sec, 60)
-            self.time_label.setText(f"{m:02d}:{s:02d}")
-            self.progress.setValue(self.remaining_tenths)
+    def _update_timer(self, remaining_ms):
+        # カウントダウン表示（残り時間は終了時刻から計算済み）
+        sec = remaining_ms // 1000
+        m, s = divmod(sec, 60)
+        self.time_label.setText(f"{m:02d}:{s:02d}")
+        self.progress.setValue(sec)
+
+    def _on_phase_finished(self, data):
+        self.audio.stop_bgm()
+        is_break = data["phase"] == BREAK
+
+        # リセットで止めたときは、そこまでの作業時間だけ記録する
+        if data["reason"] == STOPPED:
+            if not is_break:
+                self._record_study_time(data, ask=False)
             return
 
-        self.bgm_player.stop()
-
-        # 作業フェーズ完了時にセット数加算
-        if not self.is_break:
-            self.sets_completed += 1
-            self.settings.setValue("history/total_sets", self.sets_completed)
+        # 作業フェーズ完了時にセット数加算（数えるのはエンジン）
+        if not is_break:
+            self.settings.setValue("history/total_sets",
+                                   self.engine.sets_completed)
 
         # フェーズ終了時に音を鳴らす
-        if self.is_break:
-            self.player.setSource(self.break_end_sound)
-            self.study_announce.showMessage(
+        if is_break:
+            self.audio.play_effect("break_end")
+            self._announce().showMessage(
                 "休憩終了",
                 "休憩時間が終了しました! がんばりましょう!!!!",
                 QSystemTrayIcon.MessageIcon.Information,
                 10000
             )
-            self.player.play()
         else:
-            if not self.selected_task:
-                self.player.setSource(self.error_sound)
-                self.study_announce.showMessage(
+            if self._phase_task_id(data) is None:
+                self.audio.play_effect("error")
+                self._announce().showMessage(
                     "タスクが選択されていません!!!!",
                     "タスクが選択されていないため、今選択してください",
                     QSystemTrayIcon.MessageIcon.Warning,
                     10000
                 )
             else:
-                self.player.setSource(self.work_end_sound)
-                self.study_announce.showMessage(
+                self.audio.play_effect("work_end")
+                self._announce().showMessage(
                     "ポモドーロ完了",
                     "作業時間が終了しました! お疲れ様です",
                     QSystemTrayIcon.MessageIcon.Information,
                     10000
                 )
-            self.player.play()
-            self._record_study_time(self.default_minutes)
+            # 時間どおりに終わったときだけ、タスクが無ければ選んでもらう
+            # （前回の続きを復元したときは、画面が出る前なので聞かない）
+            self._record_study_time(
+                data, ask=data["reason"] == COMPLETED and not self._resuming)
 
-        # フェーズ切替
-        self.is_break = not self.is_break
-        self.timer.stop()
+        # フェーズ切替（自動開始するときはこの後 phase_started が来る）
         self._reset_display()
 
-        if self.is_break and self.auto_break:
-            self._start_phase()
-            self.timer.start()
-        elif not self.is_break and self.auto_next:
-            self._start_phase()
-            self.timer.start()
+    def _phase_task_id(self, data):
+        """
+        終わったフェーズの時間を記録するタスクの id を返す。
+        エンジンがそのフェーズを動かしていたタスクを優先し（前回の続きを復元した
+        ときはコンボボックスの選択と違うことがある）、無ければ今の選択を使う。
+        """
+        task_id = data.get("task_id")
+        if task_id is not None and self.repository.get(task_id) is not None:
+            return task_id
+        return self.selected_task_id
+
+    def _record_study_time(self, data, ask=True):
+        """
+        終わった作業フェーズで実際に進んだ時間を記録する。
 
-    def _record_study_time(self, minutes):
-        today = datetime.date.today().isoformat()
+        Args:
+            data (dict): エンジンの phase_finished の内容
+            ask (bool): タスクが決まらなければ選んでもらうか
+                （False ならどのタスクにも属さない時間として記録する）
+        """
+        seconds = int(round(data["seconds"]))
+        if seconds <= 0:
+            return False
 
-        if not self.selected_task:
-            stored_tasks = self.task_settings.value("tasks", [])
+        task_id = self._phase_task_id(data)
+        if task_id is None and ask:
+            stored_tasks = self.repository.tasks()
 
-            tasks = []
+            # 同じ名前のタスクがあっても区別できるように id も控えておく
+            labels = []
+            task_ids = []
             for task in stored_tasks:
                 name = task.get("text", "")
                 check = task.get("checked", False)
                 if not check and name:
-                    tasks.append(name)
+                    label = name
+                    if name in labels:
+                        label = f"{name} (#{task['id']})"
+                    labels.append(label)
+                    task_ids.append(task["id"])
             selected, ok = QInputDialog.getItem(
-                self, "タスク選択", "記録するタスクを選んでください:", tasks, 0, False
+                self, "タスク選択", "記録するタスクを選んでください:", labels, 0, False
             )
             if not ok or not selected:
                 return False
 
-            idx = self.task_combo.findText(selected)
+            task_id = task_ids[labels.index(selected)]
+            idx = self.task_combo.findData(task_id)
             if idx >= 0:
-                # シグナルで _on_task_changed が呼ばれ self.selected_task が更新される
+                # シグナルで _on_task_changed が呼ばれ self.selected_task_id が更新される
                 self.task_combo.setCurrentIndex(idx)
             else:
                 # 念のため直接セット
-                self.selected_task = selected
-                self.settings.setValue("current_task", selected)
+                self.selected_task_id = task_id
+                self.settings.setValue("current_task", task_id)
                 disp = selected if len(selected) <= 20 else selected[:17] + "..."
                 self.current_task_label.setText(f"実行中: {disp}")
 
-        study_records = self.task_settings.value("study_time", {})
-
-        # 今日の記録を更新
-        if today not in study_records:
-            study_records[today] = 0
-        study_records[today] += minutes
-        self.task_settings.setValue("study_time", study_records)
-
-        task_study_records = \
-            self.task_settings.value("task_study_time", {})
-        if self.selected_task not in task_study_records:
-            task_study_records[self.selected_task] = {}
-        if today not in task_study_records[self.selected_task]:
-            task_study_records[self.selected_task][today] = 0
-        task_study_records[self.selected_task][today] += minutes
-
-        # タスク別勉強時間を保存
-        self.task_settings.setValue("task_study_time", task_study_records)
+        # セッションログに1件追記して、集計の索引にも足すだけ（過去の記録は読まない）
+        # 開始・終了は実際の時刻（再起動後に締めた記録でも終わった日に入る）
+        start = data["start"]
+        self.repository.record_session(
+            task_id, seconds,
+            start=int(start) if start is not None else None,
+            end=int(data["end"]))
 
         return True
 
     def _refresh_tasks(self):
         """タスクリストを更新"""
         # 現在の選択を保存
-        current_text = self.task_combo.currentText()
+        current_id = self.task_combo.currentData()
+
+        # 作り直している間は選択変更のシグナルを止める
+        self.task_combo.blockSignals(True)
 
         # コンボボックスをクリア
         self.task_combo.clear()
-        self.task_combo.addItem("タスクなし")
+        self.task_combo.addItem("タスクなし", None)
 
-        # task.pyと同じ設定でタスクを読み込み
-        task_settings = QSettings("CHU1PC", "TaskManagerApp")
-        stored_tasks = task_settings.value("tasks", [])
+        # task.pyと同じリポジトリからタスクを読み込み
+        stored_tasks = self.repository.tasks()
 
-        # 未完了のタスクのみを追加
+        # 未完了のタスクのみを追加（データにはタスクの id を持たせる）
         for task_entry in stored_tasks:
             task_text = task_entry.get("text", "")
             task_check = task_entry.get("checked", False)
             if task_text and not task_check:
-                self.task_combo.addItem(task_text)
+                self.task_combo.addItem(task_text, task_entry["id"])
 
-        # 前の選択を復元（可能なら）
-        index = self.task_combo.findText(current_text)
-        if index >= 0:
-            self.task_combo.setCurrentIndex(index)
+        # 前の選択を復元（可能なら）。まだ何も選んでいなければ保存値から
+        if current_id is not None:
+            index = self.task_combo.findData(current_id)
         else:
-            self.task_combo.setCurrentIndex(0)  # "タスクなし"を選択
+            index = self._find_saved_task()
+        self.task_combo.setCurrentIndex(max(index, 0))  # 無ければ"タスクなし"
+        self.task_combo.blockSignals(False)
+        self._on_task_changed(self.task_combo.currentIndex())
+
+    @staticmethod
+    def _is_selectable(task):
+        """コンボボックスに並べるタスク（未完了で名前があるもの）か"""
+        return bool(task.get("text")) and not task.get("checked", False)
+
+    def _remove_combo_task(self, index):
+        """コンボボックスからタスクを外す。選択中なら"タスクなし"に戻す"""
+        if index == self.task_combo.currentIndex():
+            self.task_combo.setCurrentIndex(0)
+        self.task_combo.removeItem(index)
+
+    def _on_repo_task_added(self, task_id):
+        task = self.repository.get(task_id)
+        if self._is_selectable(task):
+            self.task_combo.addItem(task["text"], task_id)
+
+    def _on_repo_task_changed(self, task_id, fields):
+        task = self.repository.get(task_id)
+        index = self.task_combo.findData(task_id)
+        if index >= 0 and not self._is_selectable(task):
+            self._remove_combo_task(index)
+        elif index < 0 and self._is_selectable(task):
+            self.task_combo.addItem(task["text"], task_id)
+        elif index >= 0 and "text" in fields:
+            self.task_combo.setItemText(index, task["text"])
+            if index == self.task_combo.currentIndex():
+                self._on_task_changed(index)
+
+    def _on_repo_task_removed(self, task_id):
+        index = self.task_combo.findData(task_id)
+        if index >= 0:
+            self._remove_combo_task(index)
 
-    def _on_task_changed(self, task_text):
+    def _on_task_changed(self, index):
         """タスク選択が変更された時の処理"""
-        if task_text == "タスクなし" or not task_text:
-            self.selected_task = None
+        task_id = self.task_combo.itemData(index) if index >= 0 else None
+        if task_id is None:
+            self.selected_task_id = None
             self.current_task_label.setText("選択されていません")
         else:
-            self.selected_task = task_text
+            self.selected_task_id = task_id
+            task_text = self.task_combo.itemText(index)
             # テキストが長い場合は省略表示
             display_text = task_text if len(task_text) <= 20 \
                 else task_text[:17] + "..."
             self.current_task_label.setText(f"実行中: {display_text}")
 
-        # 設定に選択中のタスクを保存
-        self.settings.setValue("current_task", task_text if
-                               task_text != "タスクなし" else "")
+        # 設定に選択中のタスクの id を保存
+        self.settings.setValue("current_task",
+                               task_id if task_id is not None else "")
+        self.engine.select_task(task_id)
+
+    def _find_saved_task(self):
+        """保存されている選択中のタスクのコンボボックス上の位置を返す"""
+        saved_task = self.settings.value("current_task", "")
+        if saved_task in (None, ""):
+            return -1
+        try:
+            return self.task_combo.findData(int(saved_task))
+        except ValueError:
+            # 以前のバージョンはタスク名を保存していた
+            return self.task_combo.findText(str(saved_task))
 
     def _reset_display(self):
         """なにかしらの変更が行われたせいにその変更を画面に適応させる
         """
-        minutes = self.default_rest if self.is_break else self.default_minutes
+        minutes = self.engine.phase_minutes()
         self.time_label.setText(f"{minutes:02d}:00")
-        self.progress.setRange(0, minutes * 60 * 10)
+        self.progress.setRange(0, minutes * 60)
         self.progress.setValue(self.progress.maximum())
         self.start_btn.setText("開始")
-        self.sets_label.setText(f"セット数: \n{self.sets_completed}")
-        total_hours = (self.sets_completed * self.default_minutes) // 60
-        total_minutes = (self.sets_completed * self.default_minutes) % 60
+        sets_completed = self.engine.sets_completed
+        self.sets_label.setText(f"セット数: \n{sets_completed}")
+        total_hours = (sets_completed * self.engine.work_minutes) // 60
+        total_minutes = (sets_completed * self.engine.work_minutes) % 60
         self.total_time.setText(f"総勉強時間: \n{total_hours}時間{total_minutes}分")
         self._update_remaining()
 
         # 保存されている選択中のタスクを復元
-        saved_task = self.settings.value("current_task", "")
-        if saved_task:
-            index = self.task_combo.findText(saved_task)
-            if index >= 0:
-                self.task_combo.setCurrentIndex(index)
+        index = self._find_saved_task()
+        if index >= 0:
+            self.task_combo.setCurrentIndex(index)
@@ -0,0 +1,250 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from storage import (SearchIndex, StudyIndex, StudyMetrics, StudyQuery,
+                     get_store, parse_group)
+from .WriteBehind import WriteBehind
+
+
+# 検索の索引を作り始めるまでの時間(ミリ秒)と、1回に使う時間(秒)
+INDEX_DELAY_MS = 300
+INDEX_BUDGET = 0.01
+
+
+class TaskRepository(QObject):
+    """
+    パース済みのタスクをプロセス内で1つだけ保持するリポジトリ。
+    変更はストアへ書き込んだうえで、差分をシグナルで各画面へ通知する。
+    """
+    # 追加・変更・削除されたタスクの id を通知する
+    task_added = pyqtSignal(int)
+    task_changed = pyqtSignal(int, list)  # (id, 変更された列名のリスト)
+    task_removed = pyqtSignal(int)
+    # 並び順や中身がまとめて変わったので作り直してほしいとき
+    tasks_reordered = pyqtSignal()
+    # 勉強時間の記録が変わったとき
+    study_time_changed = pyqtSignal()
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+
+        # 詳細欄の入力などはまとめて遅延書き込みする
+        self.writer = WriteBehind(store, parent=self)
+
+        # 検索の索引は読み込んだあと、手の空いたときに少しずつ作る
+        self._index_timer = QTimer(self)
+        self._index_timer.setInterval(0)
+        self._index_timer.timeout.connect(self._index_step)
+
+        # id -> タスクの辞書。並び順はストアの並び順
+        self._tasks = {}
+        self._load()
+
+    def _load(self):
+        # 読み込んだ時点の番号。他のプロセスが書き込んだかどうかを見分ける
+        self._data_version = self.store.data_version()
+        self._tasks = {task["id"]: task for task in self.store.load_tasks()}
+        # グループ名 -> そのグループのタスクの id（dict を順序付きの集合として使う）
+        self._groups = {}
+        for task_id, task in self._tasks.items():
+            self._groups.setdefault(task["group"], {})[task_id] = None
+        # 勉強時間の集計は起動時に1回だけ作り、以後は差分で更新する
+        rows = self.store.session_totals()
+        self.study_index = StudyIndex.build(rows)
+        # 期間・タスクでの問い合わせも同じ索引を引く
+        self.query = StudyQuery(self.study_index)
+        self.metrics = StudyMetrics.build((day, seconds)
+                                          for _, day, seconds in rows)
+        # 検索の索引は起動を遅くしないよう、起動して少し経ってから作り始める。
+        # 作り終わる前の検索は、まだ索引に無いタスクを直接確かめる
+        self._search_index = SearchIndex.deferred(self._tasks)
+        self._index_timer.stop()
+        QTimer.singleShot(INDEX_DELAY_MS, self._index_timer.start)
+
+    # -------------------------------------------------------------------------
+    # 読み出し
+    # -------------------------------------------------------------------------
+
+    def tasks(self):
+        """全タスクを並び順どおりに返す（返した辞書は書き換えないこと）"""
+        return list(self._tasks.values())
+
+    def task_ids(self):
+        """全タスクの id を並び順どおりに返す"""
+        return list(self._tasks)
+
+    def get(self, task_id):
+        return self._tasks.get(task_id)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def groups(self):
+        """タスクのあるグループ名の一覧（グループ無しの "" を含む）"""
+        return list(self._groups)
+
+    def tasks_in_group(self, group):
+        """グループ group のタスクを全タスクを走査せずに返す"""
+        return [self._tasks[task_id] for task_id in self._groups.get(group, ())]
+
+    def _move_group(self, task_id, old, new):
+        members = self._groups.get(old)
+        if members is not None:
+            members.pop(task_id, None)
+            if not members:
+                del self._groups[old]
+        if new is not None:
+            self._groups.setdefault(new, {})[task_id] = None
+
+    def search(self, query):
+        """タスク名か詳細に query の語をすべて含むタスクの id の集合を返す"""
+        return self._search_index.search(query)
+
+    def matches(self, task_id, query):
+        """1件のタスクが query に当てはまるか"""
+        return self._search_index.matches(task_id, query)
+
+    def _index_task(self, task):
+        self._search_index.update(task["id"], task["text"], task["detail"])
+
+    def _index_step(self):
+        """検索の索引を1回分（入力の邪魔にならない短い時間だけ）作り進める"""
+        if not self._search_index.index_pending(INDEX_BUDGET):
+            self._index_timer.stop()
+
+    # -------------------------------------------------------------------------
+    # 書き込み
+    # -------------------------------------------------------------------------
+
+    def add_task(self, text, urgency="normal", detail=""):
+        """タスクを追加して id を返す"""
+        task_id = self.store.add_task(text, urgency, detail)
+        self._tasks[task_id] = {
+            "id": task_id,
+            "text": text,
+            "detail": detail,
+            "checked": False,
+            "urgency": urgency,
+            "group": parse_group(detail),
+        }
+        self._move_group(task_id, None, self._tasks[task_id]["group"])
+        self._index_task(self._tasks[task_id])
+        self.task_added.emit(task_id)
+        return task_id
+
+    def update_task(self, task_id, defer=False, **fields):
+        """
+        タスクの指定した列を更新する。
+
+        Args:
+            task_id (int): 更新するタスクの id
+            defer (bool): True なら書き込みを遅延させてまとめる
+            **fields: 更新する列と値
+        """
+        task = self._tasks.get(task_id)
+        if task is None:
+            return
+
+        changed = {name: value for name, value in fields.items()
+                   if task.get(name) != value}
+        if not changed:
+            return
+        task.update(changed)
+        if "text" in changed or "detail" in changed:
+            self._index_task(task)
+
+        if defer:
+            self.writer.update_task(task_id, **changed)
+        else:
+            # 同じタスクの予約済みの書き込みも一緒に書いてしまう
+            pending = self.writer.take(task_id)
+            self.store.update_task(task_id, **{**pending, **changed})
+
+        # グループは詳細が変わったときだけ取り出し直す（grp 列はストアが書く）
+        names = list(changed)
+        if "detail" in changed:
+            group = parse_group(task["detail"])
+            if group != task["group"]:
+                self._move_group(task_id, task["group"], group)
+                task["group"] = group
+                names.append("group")
+        self.task_changed.emit(task_id, names)
+
+    def remove_task(self, task_id):
+        """タスクとその勉強時間の記録を削除する"""
+        if task_id not in self._tasks:
+            return
+        self.writer.discard(task_id)
+        self.store.delete_task(task_id)
+        self.study_index.remove_task(task_id)
+        self._rebuild_metrics()
+        self._search_index.remove(task_id)
+        self._move_group(task_id, self._tasks[task_id]["group"], None)
+        del self._tasks[task_id]
+        self.task_removed.emit(task_id)
+        self.study_time_changed.emit()
+
+    # -------------------------------------------------------------------------
+    # 勉強時間
+    # -------------------------------------------------------------------------
+
+    def record_session(self, task_id, seconds, start=None, end=None):
+        """勉強したセッション(秒)を記録して集計にも反映する"""
+        day = self.store.record_session(task_id, seconds, start, end)
+        self.study_index.add(task_id, day, seconds)
+        self.metrics.add(day, seconds)
+        self.study_time_changed.emit()
+
+    def reset_day(self, day):
+        """day (ISO 形式の日付) の勉強時間の記録を削除する"""
+        self.store.delete_sessions_on(day)
+        self.study_index.reset_day(day)
+        self._rebuild_metrics()
+        self.study_time_changed.emit()
+
+    def _rebuild_metrics(self):
+        """記録が減ったときは連続日数や自己ベストも下がりうるので作り直す"""
+        self.metrics = StudyMetrics.build(self.study_index.day_totals())
+
+    def verify_metrics(self, today=None):
+        """差分で更新してきた値が、全部数え直した値と一致するか"""
+        return (self.metrics.snapshot(today) ==
+                StudyMetrics.recompute(self.study_index.day_totals(), today))
+
+    def flush(self):
+        """遅延している書き込みを今すぐ反映する"""
+        self.writer.flush()
+
+    def write_stats(self):
+        """遅延書き込みでまとめられた回数と書き込んだ回数"""
+        return self.writer.stats()
+
+    def reload(self):
+        """ストアから読み直して、各画面に作り直してもらう"""
+        self.flush()
+        self._load()
+        self.tasks_reordered.emit()
+        self.study_time_changed.emit()
+
+    def reload_if_changed(self):
+        """
+        他のプロセス (taskmanager.py など) がストアに書き込んでいたら読み直す。
+
+        Returns:
+            bool: 読み直したら True
+        """
+        if self.store.data_version() == self._data_version:
+            return False
+        self.reload()
+        return True
+
+
+_repository = None
+
+
+def get_repository():
+    """プロセス内で共有する TaskRepository を返す"""
+    global _repository
+    if _repository is None:
+        _repository = TaskRepository(get_store())
+    return _repository
@@ -0,0 +1,63 @@
+from PyQt6.QtCore import QObject, QTimer
+
+
+class WriteBehind(QObject):
+    """
+    タスクへの書き込みをまとめて遅延させる。
+    入力が止まってから delay_ms 経過したとき、または flush() が呼ばれたときに
+    タスクごとに1回だけストアへ書き込む。
+    """
+    def __init__(self, store, delay_ms=500, parent=None):
+        super().__init__(parent)
+        self.store = store
+
+        # task_id -> まだ書き込んでいない列の辞書
+        self._pending = {}
+
+        # まとめられて書き込みが省略された回数と、実際に書き込んだ回数
+        self.coalesced_count = 0
+        self.flushed_count = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def update_task(self, task_id, **fields):
+        """書き込みを予約する。入力が続く間はタイマーを延長する"""
+        if task_id in self._pending:
+            self.coalesced_count += 1
+        self._pending.setdefault(task_id, {}).update(fields)
+        self._timer.start()
+
+    def take(self, task_id):
+        """予約済みの書き込みを取り出す（呼び出し側でまとめて書き込む）"""
+        fields = self._pending.pop(task_id, {})
+        if not self._pending:
+            self._timer.stop()
+        return fields
+
+    def discard(self, task_id):
+        """予約済みの書き込みを捨てる（削除の直前に使う）"""
+        self.take(task_id)
+
+    def has_pending(self):
+        return bool(self._pending)
+
+    def flush(self):
+        """予約済みの書き込みをすべてストアへ反映する"""
+        self._timer.stop()
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        for task_id, fields in pending.items():
+            self.store.update_task(task_id, **fields)
+        self.flushed_count += len(pending)
+
+    def stats(self):
+        return {
+            "coalesced": self.coalesced_count,
+            "flushed": self.flushed_count,
+            "pending": len(self._pending),
+        }
@@ -0,0 +1,2 @@
+from .TaskRepository import TaskRepository, get_repository  # type: ignore # noqa
+from .WriteBehind import WriteBehind  # type: ignore # noqa
\ No newline at end of file
@@ -0,0 +1,120 @@
+import getpass
+import hashlib
+import json
+import os
+import time
+
+from PyQt6.QtCore import QLockFile
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+from storage.TaskStore import default_db_path
+
+
+# 動いている方が起動するまで、2つ目の起動が接続を待つ長さ(秒)
+CONNECT_TIMEOUT = 3.0
+
+
+def request_from_args(args):
+    """
+    2つ目の起動の引数から、動いている方に頼む内容を作る。
+
+        main.py                      ウィンドウを前に出す
+        main.py --add 名前 [緊急度]   タスクを追加する
+    """
+    if len(args) >= 2 and args[0] == "--add":
+        request = {"command": "add", "text": args[1]}
+        if len(args) >= 3:
+            request["urgency"] = args[2]
+        return request
+    return {"command": "raise"}
+
+
+class SingleInstance:
+    """
+    同じデータベースを使うアプリを1つしか起動させないための仕組み。
+
+    最初に起動した方が QLockFile を取り、QLocalServer で待ち受ける。
+    ロックが取れなかった方は、画面を作らずに頼みたいこと（ウィンドウを前に出す、
+    タスクを追加する）を1行の JSON で送り、返事を受け取ったらすぐに終わる。
+    データベースごとに別のロックとサーバー名を使うので、
+    TASKMANAGER_DB で別のファイルを開くなら同時に起動できる。
+    """
+    def __init__(self, db_path=None):
+        db_path = os.path.abspath(db_path or default_db_path())
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        key = hashlib.sha1(
+            f"{getpass.getuser()}:{db_path}".encode("utf-8")).hexdigest()[:16]
+        self.server_name = f"CHU1PC-TaskManagerApp-{key}"
+        self.lock = QLockFile(db_path + ".lock")
+        # 時間では古いとみなさない（落ちたプロセスのロックは PID で見分けてくれる）
+        self.lock.setStaleLockTime(0)
+        self.server = None
+
+    def acquire(self):
+        """最初の起動ならロックを取って True を返す"""
+        return self.lock.tryLock(0)
+
+    def forward(self, request):
+        """
+        動いている方に request を送る。
+
+        Returns:
+            bool: 受け取ってもらえたら True
+        """
+        socket = QLocalSocket()
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        # 動いている方がまだ起動中なら、待ち受けを始めるまで少し待つ
+        while True:
+            socket.connectToServer(self.server_name)
+            if socket.waitForConnected(200):
+                break
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+        socket.write(json.dumps(request, ensure_ascii=False)
+                     .encode("utf-8") + b"\n")
+        socket.waitForBytesWritten(1000)
+        ok = socket.waitForReadyRead(2000) and \
+            bytes(socket.readLine()).strip() == b"ok"
+        socket.disconnectFromServer()
+        return ok
+
+    def listen(self, handler):
+        """
+        2つ目の起動からの頼みを待ち受ける。handler(request) で処理する。
+        ロックを持っているので、前回落ちたときのソケットが残っていれば消してよい。
+        """
+        QLocalServer.removeServer(self.server_name)
+        self.server = QLocalServer()
+        self.server.setSocketOptions(
+            QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(
+            lambda: self._on_new_connection(handler))
+        return self.server.listen(self.server_name)
+
+    def _on_new_connection(self, handler):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(
+                lambda socket=socket: self._on_ready_read(socket, handler))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _on_ready_read(self, socket, handler):
+        if not socket.canReadLine():
+            return
+        line = bytes(socket.readLine()).decode("utf-8", "replace")
+        try:
+            request = json.loads(line)
+        except ValueError:
+            socket.write(b"error\n")
+        else:
+            handler(request)
+            socket.write(b"ok\n")
+        socket.flush()
+        socket.disconnectFromServer()
+
+    def release(self):
+        if self.server is not None:
+            self.server.close()
+        self.lock.unlock()
@@ -0,0 +1,123 @@
+from PyQt6.QtCore import QObject, QSettings, QTimer, QUrl
+
+from utils import resource_path
+
+
+# 効果音の名前 -> 音声ファイル
+EFFECTS = {
+    "work_end": "audio/beep2.mp3",
+    "break_end": "audio/beep1.mp3",
+    "error": "audio/error.mp3",
+}
+BGM = "audio/clock.mp3"
+
+
+class AudioService(QObject):
+    """
+    効果音と勉強中の BGM を鳴らすサービス。
+
+    QtMultimedia の読み込みとプレイヤーの準備は起動後に遅らせて行う。
+    効果音は1つずつ専用のプレイヤーに読み込んでおき、鳴らすときは
+    頭出しして再生するだけにする（フェーズ終了の瞬間にデコードしない）。
+    QSoundEffect は WAV しか扱えないため、mp3 の効果音にはプレイヤーを使う。
+    BGM は1つのプレイヤーを使い回してループ再生する。
+    """
+    def __init__(self, settings=None, parent=None):
+        super().__init__(parent)
+        self.settings = settings or QSettings("CHU1PC", "PomodoroApp")
+        self._sfx_volume = float(self.settings.value("audio/volume", 0.5))
+        self._bgm_volume = float(self.settings.value("audio/bgm_volume", 0.2))
+
+        # 効果音の名前 -> (プレイヤー, 出力)。warm_up() までは空
+        self._effects = {}
+        self._bgm_player = None
+        self._bgm_output = None
+
+    @property
+    def ready(self):
+        return self._bgm_player is not None
+
+    def warm_up_later(self, delay_ms=500):
+        """起動の描画が終わったころにプレイヤーを準備する"""
+        QTimer.singleShot(delay_ms, self.warm_up)
+
+    def warm_up(self):
+        """QtMultimedia を読み込み、効果音と BGM をあらかじめ読み込んでおく"""
+        if self.ready:
+            return
+        from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
+
+        for name, path in EFFECTS.items():
+            player = QMediaPlayer(self)
+            output = QAudioOutput(self)
+            output.setVolume(self._sfx_volume)
+            player.setAudioOutput(output)
+            player.setSource(QUrl.fromLocalFile(resource_path(path)))
+            self._effects[name] = (player, output)
+
+        self._bgm_output = QAudioOutput(self)
+        self._bgm_output.setVolume(self._bgm_volume)
+        self._bgm_player = QMediaPlayer(self)
+        self._bgm_player.setAudioOutput(self._bgm_output)
+        self._bgm_player.setLoops(QMediaPlayer.Loops.Infinite)
+        self._bgm_player.setSource(QUrl.fromLocalFile(resource_path(BGM)))
+
+    # -------------------------------------------------------------------------
+    # 効果音
+    # -------------------------------------------------------------------------
+
+    def play_effect(self, name):
+        """効果音 name (work_end / break_end / error) を頭から鳴らす"""
+        self.warm_up()
+        player, _ = self._effects[name]
+        player.setPosition(0)
+        player.play()
+
+    # -------------------------------------------------------------------------
+    # BGM
+    # -------------------------------------------------------------------------
+
+    def play_bgm(self):
+        self.warm_up()
+        self._bgm_player.play()
+
+    def pause_bgm(self):
+        if self.ready:
+            self._bgm_player.pause()
+
+    def stop_bgm(self):
+        if self.ready:
+            self._bgm_player.stop()
+
+    # -------------------------------------------------------------------------
+    # 音量 (0.0 ~ 1.0)
+    # -------------------------------------------------------------------------
+
+    def sfx_volume(self):
+        return self._sfx_volume
+
+    def bgm_volume(self):
+        return self._bgm_volume
+
+    def set_volumes(self, sfx_volume, bgm_volume):
+        """効果音と BGM の音量を変えて保存する"""
+        self._sfx_volume = sfx_volume
+        self._bgm_volume = bgm_volume
+        for _, output in self._effects.values():
+            output.setVolume(sfx_volume)
+        if self._bgm_output is not None:
+            self._bgm_output.setVolume(bgm_volume)
+
+        self.settings.setValue("audio/volume", sfx_volume)
+        self.settings.setValue("audio/bgm_volume", bgm_volume)
+
+
+_audio = None
+
+
+def get_audio():
+    """プロセス内で共有する AudioService を返す"""
+    global _audio
+    if _audio is None:
+        _audio = AudioService()
+    return _audio
@@ -0,0 +1 @@
+from .AudioService import AudioService, get_audio  # type: ignore # noqa
\ No newline at end of file
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupTiming:
+    """
+    起動にかかった時間を記録する。
+    環境変数 TASKMANAGER_STARTUP_TIMING を設定して起動すると、
+    最初に描画されたところで標準エラーに内訳を出す。
+    その後に開いた画面は、作るたびにその時間を出す。
+    """
+    def __init__(self):
+        self.origin = time.perf_counter()
+        # (名前, 起動からの経過ミリ秒)
+        self.marks = []
+        # 画面名 -> 作るのにかかったミリ秒
+        self.screens = {}
+        self.enabled = bool(os.environ.get("TASKMANAGER_STARTUP_TIMING"))
+        self._reported = False
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.origin) * 1000
+
+    def mark(self, name):
+        """起動からの経過時間を name として記録する"""
+        self.marks.append((name, self.elapsed_ms()))
+
+    @contextmanager
+    def measure(self, screen):
+        """with の中で画面 screen を作るのにかかった時間を記録する"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.screens[screen] = (time.perf_counter() - start) * 1000
+            if self.enabled and self._reported:
+                print(f"build {screen}: {self.screens[screen]:.1f} ms",
+                      file=sys.stderr)
+
+    def report(self):
+        lines = ["startup timing:"]
+        lines.extend(f"  {name:<20} {ms:8.1f} ms" for name, ms in self.marks)
+        lines.extend(f"  build {screen:<14} {ms:8.1f} ms"
+                     for screen, ms in self.screens.items())
+        return "\n".join(lines)
+
+    def write_report(self):
+        self._reported = True
+        if self.enabled:
+            print(self.report(), file=sys.stderr)
+
+
+# main.py を読み込んだ時点を起動時刻とみなす
+timing = StartupTiming()
@@ -0,0 +1,218 @@
+import math
+
+import numpy as np
+from PyQt6.QtWidgets import QWidget, QToolTip
+from PyQt6.QtCore import Qt, QRectF, QPointF
+from PyQt6.QtGui import QPainter, QColor, QPen, QPolygonF
+
+from utils import format_seconds
+
+
+BACKGROUND = QColor("#282828")
+EMPTY = QColor("#333333")
+TEXT = QColor("#dddddd")
+ACCENT = QColor("#3eb969")
+LINE = QColor("#ffd800")
+
+
+def blend(ratio):
+    """0 なら空のマスの色、1 なら強調色になる色"""
+    ratio = min(max(ratio, 0.0), 1.0)
+    return QColor(
+        round(EMPTY.red() + (ACCENT.red() - EMPTY.red()) * ratio),
+        round(EMPTY.green() + (ACCENT.green() - EMPTY.green()) * ratio),
+        round(EMPTY.blue() + (ACCENT.blue() - EMPTY.blue()) * ratio))
+
+
+class HeatmapView(QWidget):
+    """
+    2次元の配列をマスの濃さで描くヒートマップ。
+    値は秒で、NaN のマスは範囲外として描かない。
+    """
+    LABEL_WIDTH = 40
+    LABEL_HEIGHT = 18
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.values = None
+        self.rows = []
+        self.cols = []
+        self._peak = 0.0
+        self.setMinimumHeight(140)
+        self.setMouseTracking(True)
+
+    def set_data(self, values, rows, cols):
+        self.values = values
+        self.rows = rows
+        self.cols = cols
+        finite = values[~np.isnan(values)]
+        self._peak = float(finite.max()) if finite.size else 0.0
+        self.update()
+
+    def _cell_size(self):
+        n_rows, n_cols = self.values.shape
+        width = (self.width() - self.LABEL_WIDTH) / max(n_cols, 1)
+        height = (self.height() - self.LABEL_HEIGHT) / max(n_rows, 1)
+        return min(width, height)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), BACKGROUND)
+        if self.values is None or not self.values.size:
+            return
+
+        size = self._cell_size()
+        gap = 2 if size > 8 else 1
+        painter.setPen(TEXT)
+        for row, label in enumerate(self.rows):
+            painter.drawText(
+                QRectF(0, self.LABEL_HEIGHT + row * size,
+                       self.LABEL_WIDTH - 4, size),
+                Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                label)
+        for col, label in enumerate(self.cols):
+            if label:
+                painter.drawText(
+                    QPointF(self.LABEL_WIDTH + col * size,
+                            self.LABEL_HEIGHT - 4), label)
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        peak = self._peak or 1.0
+        for (row, col), value in _cells(self.values):
+            color = EMPTY if value <= 0 else blend(0.2 + 0.8 * value / peak)
+            painter.fillRect(
+                QRectF(self.LABEL_WIDTH + col * size,
+                       self.LABEL_HEIGHT + row * size,
+                       size - gap, size - gap), color)
+
+    def mouseMoveEvent(self, event):
+        if self.values is None or not self.values.size:
+            return
+        size = self._cell_size()
+        col = int((event.position().x() - self.LABEL_WIDTH) // size)
+        row = int((event.position().y() - self.LABEL_HEIGHT) // size)
+        n_rows, n_cols = self.values.shape
+        if not (0 <= row < n_rows and 0 <= col < n_cols):
+            QToolTip.hideText()
+            return
+        value = self.values[row, col]
+        if math.isnan(value):
+            QToolTip.hideText()
+            return
+        QToolTip.showText(event.globalPosition().toPoint(),
+                          format_seconds(value), self)
+
+
+def _cells(values):
+    """((行, 列), 値) を NaN のマスを飛ばして返す"""
+    for row, line in enumerate(values.tolist()):
+        for col, value in enumerate(line):
+            if not math.isnan(value):
+                yield (row, col), value
+
+
+class TrendView(QWidget):
+    """区間ごとの合計を棒で、その移動平均を線で描く"""
+    MARGIN = 20
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.values = None
+        self.average = None
+        self.labels = ("", "")
+        self.setMinimumHeight(140)
+
+    def set_data(self, values, average, labels):
+        self.values = values
+        self.average = average
+        self.labels = labels
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), BACKGROUND)
+        if self.values is None or not len(self.values):
+            return
+
+        left, top = 4, 4
+        width = self.width() - 8
+        height = self.height() - self.MARGIN - top
+        count = len(self.values)
+        peak = float(self.values.max()) or 1.0
+        step = width / count
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        for i, value in enumerate(self.values.tolist()):
+            bar = height * value / peak
+            painter.fillRect(
+                QRectF(left + i * step, top + height - bar,
+                       max(step - 1, 1), bar), ACCENT)
+
+        points = QPolygonF()
+        for i, value in enumerate(self.average.tolist()):
+            if not math.isnan(value):
+                points.append(QPointF(left + (i + 0.5) * step,
+                                      top + height - height * value / peak))
+        if points.size() > 1:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(QPen(LINE, 2))
+            painter.drawPolyline(points)
+
+        painter.setPen(TEXT)
+        baseline = top + height + self.MARGIN - 4
+        painter.drawText(QPointF(left, baseline), self.labels[0])
+        painter.drawText(
+            QRectF(left, top + height, width, self.MARGIN),
+            Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+            self.labels[1])
+
+
+class BreakdownView(QWidget):
+    """タスクごとの合計を、範囲内の合計に占める割合の横棒で描く"""
+    ROW_HEIGHT = 22
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # [(名前, 秒)]
+        self.entries = []
+        self.total = 0
+        self.setMinimumHeight(140)
+
+    def set_data(self, entries, total):
+        self.entries = entries
+        self.total = total
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), BACKGROUND)
+        if not self.entries:
+            painter.setPen(TEXT)
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter,
+                             "記録がありません")
+            return
+
+        total = self.total or 1
+        name_width = self.width() * 0.35
+        time_width = 130
+        bar_width = self.width() - name_width - time_width - 12
+        metrics = painter.fontMetrics()
+        for i, (name, seconds) in enumerate(self.entries):
+            y = 4 + i * self.ROW_HEIGHT
+            if y + self.ROW_HEIGHT > self.height():
+                break
+            painter.setPen(TEXT)
+            painter.drawText(
+                QRectF(4, y, name_width - 8, self.ROW_HEIGHT),
+                Qt.AlignmentFlag.AlignVCenter,
+                metrics.elidedText(name, Qt.TextElideMode.ElideRight,
+                                   int(name_width - 8)))
+            painter.fillRect(
+                QRectF(name_width, y + 4,
+                       max(bar_width * seconds / total, 1),
+                       self.ROW_HEIGHT - 8), ACCENT)
+            painter.drawText(
+                QRectF(self.width() - time_width - 4, y, time_width,
+                       self.ROW_HEIGHT),
+                Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                f"{format_seconds(seconds)} ({100 * seconds / total:.0f}%)")
@@ -0,0 +1,123 @@
+from PyQt6.QtWidgets import (QVBoxLayout, QHBoxLayout, QLabel, QWidget,
+                             QComboBox
+                             )
+
+from repository import get_repository
+from utils import format_seconds
+from .Charts import HeatmapView, TrendView, BreakdownView
+from .StudyStats import StudyStats, PERIODS
+
+
+class StatsWidget(QWidget):
+    """
+    勉強時間の統計画面。
+    期間ごとのヒートマップ・推移・タスク別の内訳を表示する。
+    集計は StudyStats が期間ごとにキャッシュし、記録が変わったときだけやり直す。
+    """
+    def __init__(self):
+        super().__init__()
+        self.repository = get_repository()
+        self.stats = StudyStats(self.repository.store)
+
+        # 表示していない間に記録が変わったら、次に表示するときに集計し直す
+        self.repository.study_time_changed.connect(self._on_study_time_changed)
+
+        self._setup_ui()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        header = QHBoxLayout()
+        self.period_select = QComboBox(self)
+        self.period_select.setStyleSheet("""
+            QComboBox {
+                background-color: #333;
+                color: #ddd;
+                border: 1px solid #555;
+                border-radius: 4px;
+                padding: 5px;
+                min-width: 100px;
+            }
+            QComboBox QAbstractItemView {
+                background-color: #333;
+                color: #ddd;
+                selection-background-color: #555;
+            }
+        """)
+        for period in PERIODS:
+            self.period_select.addItem(period)
+        self.period_select.currentTextChanged.connect(self.refresh)
+        header.addWidget(self.period_select)
+
+        self.summary_label = QLabel("")
+        self.summary_label.setStyleSheet("""
+            color: #ffffff;
+            background-color: #333;
+            border-radius: 5px;
+            padding: 8px;
+            font-size: 14px;
+        """)
+        header.addWidget(self.summary_label, stretch=1)
+        layout.addLayout(header)
+
+        layout.addWidget(self._title("ヒートマップ"))
+        self.heatmap = HeatmapView(self)
+        layout.addWidget(self.heatmap, stretch=2)
+
+        bottom = QHBoxLayout()
+        trend_layout = QVBoxLayout()
+        trend_layout.addWidget(self._title("推移（線は移動平均）"))
+        self.trend = TrendView(self)
+        trend_layout.addWidget(self.trend, stretch=1)
+        bottom.addLayout(trend_layout, stretch=3)
+
+        breakdown_layout = QVBoxLayout()
+        breakdown_layout.addWidget(self._title("タスク別"))
+        self.breakdown = BreakdownView(self)
+        breakdown_layout.addWidget(self.breakdown, stretch=1)
+        bottom.addLayout(breakdown_layout, stretch=2)
+        layout.addLayout(bottom, stretch=2)
+
+    @staticmethod
+    def _title(text):
+        label = QLabel(text)
+        label.setStyleSheet("color: #ffffff; font-weight: bold;")
+        return label
+
+    def _on_study_time_changed(self):
+        self.stats.invalidate()
+        if self.isVisible():
+            self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # キャッシュがあれば集計はせず、タスク名だけ引き直して描く
+        self.refresh()
+
+    def refresh(self, *args):
+        """選んでいる期間の集計を表示する"""
+        period = self.period_select.currentText()
+        summary = self.stats.summary(period)
+
+        unit = summary["unit"]
+        trend = "増加" if summary["slope"] >= 0 else "減少"
+        self.summary_label.setText(
+            f"合計: {format_seconds(summary['total'])}　"
+            f"1{unit}平均: {format_seconds(summary['average'])}　"
+            f"傾向: 1{unit}あたり{format_seconds(abs(summary['slope']))}"
+            f"{trend}")
+
+        self.heatmap.set_data(summary["heatmap"], summary["rows"],
+                              summary["cols"])
+        self.trend.set_data(summary["trend"], summary["trend_average"],
+                            summary["trend_labels"])
+        self.breakdown.set_data([(self._task_name(task_id), seconds)
+                                 for task_id, seconds
+                                 in summary["breakdown"]],
+                                summary["total"])
+
+    def _task_name(self, task_id):
+        if task_id == "other":
+            return "その他"
+        task = self.repository.get(task_id) if task_id is not None else None
+        return task["text"] if task else "タスクなし"
@@ -0,0 +1,231 @@
+import datetime
+import time
+
+import numpy as np
+
+
+# 集計の期間
+DAILY = "日別"
+WEEKLY = "週別"
+MONTHLY = "月別"
+PERIODS = (DAILY, WEEKLY, MONTHLY)
+
+WEEKDAYS = ["月", "火", "水", "木", "金", "土", "日"]
+
+# 内訳に出すタスクの数（残りは「その他」にまとめる）
+BREAKDOWN_LIMIT = 8
+
+EPOCH = datetime.date(1970, 1, 1)
+
+
+def day_number(day):
+    """日付を 1970-01-01 からの日数にする"""
+    return (day - EPOCH).days
+
+
+def local_hours(days, starts):
+    """
+    開始時刻(UNIX 時間)を、その日の現地時刻の「時」にする。開始時刻が無ければ -1。
+    時差は記録のある日ごとに1回だけ調べる（夏時間にも合わせるため）。
+    """
+    hours = np.full(len(starts), -1, dtype=np.int64)
+    if not len(starts):
+        return hours
+    unique, inverse = np.unique(days, return_inverse=True)
+    offsets = np.array([time.localtime(int(day) * 86400 + 43200).tm_gmtoff
+                        for day in unique], dtype=np.int64)
+    known = starts >= 0
+    local = starts[known] + offsets[inverse[known]]
+    hours[known] = (local // 3600) % 24
+    return hours
+
+
+def moving_average(values, width):
+    """width 区間の移動平均。最初の width - 1 区間は NaN にする"""
+    result = np.full(len(values), np.nan)
+    if len(values) >= width:
+        kernel = np.ones(width) / width
+        result[width - 1:] = np.convolve(values, kernel, mode="valid")
+    return result
+
+
+def slope(values):
+    """最小二乗で引いた直線の傾き（1区間あたり）"""
+    if len(values) < 2:
+        return 0.0
+    return float(np.polyfit(np.arange(len(values)), values, 1)[0])
+
+
+class StudyStats:
+    """
+    セッションログを列ごとの NumPy 配列で持ち、統計画面の集計を行う。
+    集計は期間（日別・週別・月別）ごとにまとめて計算してキャッシュし、
+    記録が変わったら invalidate() で配列ごと捨てて次に使うときに読み直す。
+
+    summary() の返す辞書:
+        heatmap        2次元の配列(秒)。NaN は範囲外のマス
+        rows, cols     ヒートマップの行・列の見出し
+        trend          区間ごとの合計(秒)
+        trend_average  trend の移動平均
+        trend_labels   trend の最初と最後の区間の見出し
+        unit           区間の単位（日・週・月）
+        total          範囲内の合計(秒)
+        average        1区間あたりの平均(秒)
+        slope          trend の傾き（1区間あたりの秒）
+        breakdown      [(task_id, 秒)] 多い順。task_id None はタスク無し
+    """
+    def __init__(self, store):
+        self.store = store
+        self._columns = None
+        # (期間, 今日) -> summary() の結果
+        self._cache = {}
+
+    def invalidate(self):
+        """記録が変わったので集計をやり直してもらう"""
+        self._columns = None
+        self._cache = {}
+
+    def _load(self):
+        if self._columns is None:
+            task_ids, days, starts, seconds = self.store.session_columns()
+            days = np.array(days, dtype="datetime64[D]").astype(np.int64)
+            self._columns = {
+                "task": np.array(task_ids, dtype=np.int64),
+                "day": days,
+                "hour": local_hours(days, np.array(starts, dtype=np.int64)),
+                "seconds": np.array(seconds, dtype=np.int64),
+            }
+        return self._columns
+
+    def summary(self, period, today=None):
+        """period の集計結果を返す（同じ日のうちはキャッシュを返す）"""
+        today = today or datetime.date.today()
+        key = (period, today)
+        result = self._cache.get(key)
+        if result is None:
+            builder = {
+                DAILY: self._daily,
+                WEEKLY: self._weekly,
+                MONTHLY: self._monthly,
+            }[period]
+            result = builder(self._load(), today)
+            self._cache[key] = result
+        return result
+
+    # -------------------------------------------------------------------------
+    # 期間ごとの集計
+    # -------------------------------------------------------------------------
+
+    def _daily(self, columns, today):
+        """直近53週のカレンダー（曜日×週）と日ごとの推移"""
+        weeks = 53
+        last = day_number(today)
+        first = last - today.weekday() - (weeks - 1) * 7
+        mask = (columns["day"] >= first) & (columns["day"] <= last)
+
+        per_day = np.bincount(columns["day"][mask] - first,
+                              weights=columns["seconds"][mask],
+                              minlength=weeks * 7).astype(float)
+        heatmap = per_day.copy()
+        heatmap[last - first + 1:] = np.nan
+        heatmap = heatmap.reshape(weeks, 7).T
+
+        # 月が変わる週に月の見出しを付ける
+        cols = []
+        previous = None
+        for week in range(weeks):
+            month = (EPOCH + datetime.timedelta(days=first + week * 7)).month
+            cols.append(f"{month}月" if month != previous else "")
+            previous = month
+
+        trend = per_day[:last - first + 1]
+        start = EPOCH + datetime.timedelta(days=first)
+        return self._result(
+            columns, mask, heatmap, WEEKDAYS, cols, trend, 7,
+            (start.strftime("%Y/%m/%d"), today.strftime("%Y/%m/%d")), "日")
+
+    def _weekly(self, columns, today):
+        """直近52週の曜日×時間帯と週ごとの推移"""
+        weeks = 52
+        last = day_number(today)
+        first = last - today.weekday() - (weeks - 1) * 7
+        mask = (columns["day"] >= first) & (columns["day"] <= last)
+
+        # 1970-01-01 は木曜日なので、月曜日を 0 にするには 3 を足す
+        weekday = (columns["day"] + 3) % 7
+        hour = columns["hour"]
+        in_hours = mask & (hour >= 0)
+        heatmap = np.bincount(weekday[in_hours] * 24 + hour[in_hours],
+                              weights=columns["seconds"][in_hours],
+                              minlength=7 * 24).astype(float).reshape(7, 24)
+        cols = [str(h) if h % 3 == 0 else "" for h in range(24)]
+
+        trend = np.bincount((columns["day"][mask] - first) // 7,
+                            weights=columns["seconds"][mask],
+                            minlength=weeks).astype(float)
+        start = EPOCH + datetime.timedelta(days=first)
+        return self._result(
+            columns, mask, heatmap, WEEKDAYS, cols, trend, 4,
+            (start.strftime("%Y/%m/%d"), today.strftime("%Y/%m/%d")), "週")
+
+    def _monthly(self, columns, today):
+        """記録のある全期間の年×月と月ごとの推移"""
+        # 1970-01 からの月数
+        months = (columns["day"].astype("datetime64[D]")
+                  .astype("datetime64[M]").astype(np.int64))
+        last = (today.year - 1970) * 12 + today.month - 1
+        first = min(int(months.min()), last) if len(months) else last
+        first -= first % 12
+        mask = (months >= first) & (months <= last)
+
+        per_month = np.bincount(months[mask] - first,
+                                weights=columns["seconds"][mask],
+                                minlength=last - first + 1).astype(float)
+        years = (last - first) // 12 + 1
+        heatmap = np.full(years * 12, np.nan)
+        heatmap[:len(per_month)] = per_month
+        heatmap = heatmap.reshape(years, 12)
+        rows = [str(1970 + (first // 12) + year) for year in range(years)]
+        cols = [f"{month}月" for month in range(1, 13)]
+
+        # 推移は最初に記録のあった月から
+        data_first = int(months.min()) if len(months) else last
+        trend = per_month[max(0, data_first - first):]
+        start_month = max(data_first, first)
+        labels = (f"{1970 + start_month // 12}/{start_month % 12 + 1:02d}",
+                  today.strftime("%Y/%m"))
+        return self._result(
+            columns, mask, heatmap, rows, cols, trend, 3, labels, "月")
+
+    @staticmethod
+    def _result(columns, mask, heatmap, rows, cols, trend, window,
+                trend_labels, unit):
+        return {
+            "heatmap": heatmap,
+            "rows": rows,
+            "cols": cols,
+            "trend": trend,
+            "trend_average": moving_average(trend, window),
+            "trend_labels": trend_labels,
+            "unit": unit,
+            "total": int(columns["seconds"][mask].sum()),
+            "average": float(trend.mean()) if len(trend) else 0.0,
+            "slope": slope(trend),
+            "breakdown": StudyStats._breakdown(columns["task"][mask],
+                                               columns["seconds"][mask]),
+        }
+
+    @staticmethod
+    def _breakdown(task_ids, seconds):
+        """タスクごとの合計を多い順に。多すぎる分は ("other", 秒) にまとめる"""
+        if not len(task_ids):
+            return []
+        ids, inverse = np.unique(task_ids, return_inverse=True)
+        totals = np.bincount(inverse, weights=seconds)
+        order = np.argsort(-totals, kind="stable")
+        breakdown = [(int(ids[i]) or None, int(totals[i]))
+                     for i in order[:BREAKDOWN_LIMIT]]
+        rest = int(totals[order[BREAKDOWN_LIMIT:]].sum())
+        if rest:
+            breakdown.append(("other", rest))
+        return breakdown
@@ -0,0 +1,2 @@
+from .Stats import StatsWidget  # type: ignore # noqa
+from .StudyStats import StudyStats  # type: ignore # noqa
\ No newline at end of file
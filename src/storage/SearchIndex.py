@@ -0,0 +1,186 @@
+import time
+import unicodedata
+
+
+def normalize(text):
+    """全角半角や大文字小文字の違いを吸収した検索用の文字列にする"""
+    return unicodedata.normalize("NFKC", text or "").casefold()
+
+
+def bigrams(text):
+    """2文字の n-gram の集合（日本語は単語に区切れないため n-gram にする）"""
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class SearchIndex:
+    """
+    タスク名と詳細に対する n-gram の転置索引。
+    検索語の n-gram を持つタスクに絞り込んでから部分一致で確かめるので、
+    全タスクを走査せずに結果を返せる。
+
+    数万件の索引を一度に作ると数秒かかるので、deferred() で作ったときは
+    index_pending() で少しずつ索引に入れる。まだ索引に入っていないタスクは
+    正規化した文字列を直接確かめる（5万件でも数十ミリ秒で済む）。
+    """
+    def __init__(self):
+        # n-gram -> その n-gram を含むタスクの id の集合
+        self._postings = {}
+        # task_id -> 正規化したタスク名と詳細（索引に入っているもの）
+        self._docs = {}
+        # task_id -> タスクの辞書（まだ正規化もしていないもの）
+        self._raw = {}
+        # task_id -> 正規化したタスク名と詳細（まだ索引に入っていないもの）
+        self._pending = {}
+
+    @classmethod
+    def build(cls, tasks):
+        index = cls()
+        for task in tasks:
+            index.update(task["id"], task["text"], task["detail"])
+        return index
+
+    @classmethod
+    def deferred(cls, tasks):
+        """
+        索引に入れるのを後回しにして作る。
+
+        Args:
+            tasks (dict): task_id -> タスクの辞書（"text" と "detail" を持つ）
+        """
+        index = cls()
+        index._raw = dict(tasks)
+        return index
+
+    def has_pending(self):
+        """まだ索引に入っていないタスクがあるか"""
+        return bool(self._raw or self._pending)
+
+    def index_pending(self, budget=0.01):
+        """
+        まだ索引に入っていないタスクを budget 秒まで索引に入れる。
+        先に全件を正規化してから (安い)、n-gram を登録する (高い)。
+
+        Returns:
+            bool: まだ残っていれば True
+        """
+        deadline = time.perf_counter() + budget
+        while self._raw:
+            self._normalize_raw(256)
+            if time.perf_counter() >= deadline:
+                return self.has_pending()
+        while self._pending:
+            for _ in range(min(64, len(self._pending))):
+                task_id, doc = self._pending.popitem()
+                self._post(task_id, doc)
+            if time.perf_counter() >= deadline:
+                break
+        return self.has_pending()
+
+    def _normalize_raw(self, count=None):
+        """正規化していないタスクを count 件（None なら全件）正規化する"""
+        if count is None:
+            count = len(self._raw)
+        for _ in range(min(count, len(self._raw))):
+            task_id, task = self._raw.popitem()
+            self._pending[task_id] = normalize(
+                f"{task['text']}\n{task['detail']}")
+
+    def _post(self, task_id, doc):
+        """まだ索引に無いタスクの n-gram を登録する"""
+        postings = self._postings
+        for gram in bigrams(doc):
+            ids = postings.get(gram)
+            if ids is None:
+                postings[gram] = {task_id}
+            else:
+                ids.add(task_id)
+        self._docs[task_id] = doc
+
+    def update(self, task_id, text, detail):
+        """タスクを索引に入れる（すでにあれば差分だけ入れ替える）"""
+        self._raw.pop(task_id, None)
+        self._pending.pop(task_id, None)
+        doc = normalize(f"{text}\n{detail}")
+        old_doc = self._docs.get(task_id)
+        if old_doc == doc:
+            return
+        if old_doc is None:
+            self._post(task_id, doc)
+            return
+        old = bigrams(old_doc)
+        new = bigrams(doc)
+        for gram in old - new:
+            ids = self._postings[gram]
+            ids.discard(task_id)
+            if not ids:
+                del self._postings[gram]
+        for gram in new - old:
+            self._postings.setdefault(gram, set()).add(task_id)
+        self._docs[task_id] = doc
+
+    def remove(self, task_id):
+        self._raw.pop(task_id, None)
+        self._pending.pop(task_id, None)
+        doc = self._docs.pop(task_id, None)
+        if doc is None:
+            return
+        for gram in bigrams(doc):
+            ids = self._postings[gram]
+            ids.discard(task_id)
+            if not ids:
+                del self._postings[gram]
+
+    @staticmethod
+    def terms(query):
+        """空白区切りの検索語（すべて含むものを探す）"""
+        return [term for term in normalize(query).split() if term]
+
+    def search(self, query):
+        """query の検索語をすべて含むタスクの id の集合を返す"""
+        terms = self.terms(query)
+        if not terms:
+            return set(self._docs) | set(self._pending) | set(self._raw)
+        result = self._search_indexed(terms)
+        if self.has_pending():
+            # 索引に入っていない分は直接確かめる
+            self._normalize_raw()
+            result |= {task_id for task_id, doc in self._pending.items()
+                       if all(term in doc for term in terms)}
+        return result
+
+    def _search_indexed(self, terms):
+        """索引に入っているタスクから探す"""
+        # 長い検索語ほど候補が少ないので先に絞り込む
+        terms.sort(key=len, reverse=True)
+        result = None
+        for term in terms:
+            if len(term) == 1:
+                # 1文字は索引を引かず、残っている候補を直接確かめる
+                candidates = self._docs if result is None else result
+            else:
+                # 候補の少ない n-gram から絞り込む
+                postings = sorted((self._postings.get(gram, set())
+                                   for gram in bigrams(term)), key=len)
+                candidates = set(postings[0])
+                for ids in postings[1:]:
+                    candidates &= ids
+                    if not candidates:
+                        break
+                if result is not None:
+                    candidates &= result
+            # 2文字ずつ全て含んでいても並びが違うことがあるので部分一致で確かめる
+            result = {task_id for task_id in candidates
+                      if term in self._docs[task_id]}
+            if not result:
+                break
+        return result
+
+    def matches(self, task_id, query):
+        """1件のタスクが query に当てはまるか"""
+        doc = self._docs.get(task_id) or self._pending.get(task_id)
+        if doc is None:
+            task = self._raw.get(task_id)
+            if task is None:
+                return False
+            doc = normalize(f"{task['text']}\n{task['detail']}")
+        return all(term in doc for term in self.terms(query))
@@ -0,0 +1,107 @@
+import bisect
+
+
+class StudyIndex:
+    """
+    勉強時間(秒)の集計をメモリ上に持っておく索引。
+    タスク別の合計・タスク別日別・全体の合計をそれぞれ O(1) で返し、
+    記録の追加・タスクの削除・日のリセットのたびに差分だけ更新する。
+    記録のある日付は並べて持っておき、期間で引くときは二分探索で両端を探す。
+    """
+    def __init__(self):
+        # task_id -> {日付: 秒}
+        self._task_days = {}
+        # task_id -> 秒
+        self._task_totals = {}
+        # 日付 -> {task_id: 秒}（task_id が None の記録も含む）
+        self._day_tasks = {}
+        # _day_tasks の日付を昇順に並べたもの（ISO 形式なので文字列順 = 日付順）
+        self._days = []
+        # タスクに紐づく記録の合計(秒)
+        self._total = 0
+
+    @classmethod
+    def build(cls, rows):
+        """(task_id, 日付, 秒) の行から索引を作る"""
+        index = cls()
+        for task_id, day, seconds in rows:
+            index.add(task_id, day, seconds)
+        return index
+
+    def add(self, task_id, day, seconds):
+        """記録を1件分だけ索引に足す"""
+        per_day = self._day_tasks.get(day)
+        if per_day is None:
+            per_day = self._day_tasks[day] = {}
+            # ふつうは今日の記録なので末尾に足すだけで済む
+            if not self._days or self._days[-1] < day:
+                self._days.append(day)
+            else:
+                bisect.insort(self._days, day)
+        per_day[task_id] = per_day.get(task_id, 0) + seconds
+        if task_id is None:
+            return
+
+        days = self._task_days.setdefault(task_id, {})
+        days[day] = days.get(day, 0) + seconds
+        self._task_totals[task_id] = \
+            self._task_totals.get(task_id, 0) + seconds
+        self._total += seconds
+
+    def remove_task(self, task_id):
+        """タスクの記録を索引から取り除く（そのタスクの記録日数に比例）"""
+        days = self._task_days.pop(task_id, {})
+        for day in days:
+            per_day = self._day_tasks.get(day)
+            if per_day is not None:
+                per_day.pop(task_id, None)
+                if not per_day:
+                    del self._day_tasks[day]
+                    self._remove_day(day)
+        self._total -= self._task_totals.pop(task_id, 0)
+
+    def reset_day(self, day):
+        """day の記録を索引から取り除く（その日に記録のあるタスク数に比例）"""
+        if day in self._day_tasks:
+            self._remove_day(day)
+        for task_id, seconds in self._day_tasks.pop(day, {}).items():
+            if task_id is None:
+                continue
+            days = self._task_days.get(task_id)
+            if days is not None:
+                days.pop(day, None)
+            self._task_totals[task_id] -= seconds
+            self._total -= seconds
+
+    def _remove_day(self, day):
+        position = bisect.bisect_left(self._days, day)
+        if position < len(self._days) and self._days[position] == day:
+            del self._days[position]
+
+    def days_between(self, start=None, end=None):
+        """
+        start 以上 end 以下の日付の (日付, {task_id: 秒}) を日付順に返す。
+        None の端は制限しない。両端を二分探索するので O(log n + 該当日数)。
+        """
+        low = 0 if start is None else bisect.bisect_left(self._days, start)
+        high = (len(self._days) if end is None
+                else bisect.bisect_right(self._days, end))
+        for day in self._days[low:high]:
+            yield day, self._day_tasks[day]
+
+    def task_total(self, task_id):
+        return self._task_totals.get(task_id, 0)
+
+    def task_day(self, task_id, day):
+        return self._task_days.get(task_id, {}).get(day, 0)
+
+    def day_totals(self):
+        """(日付, その日の合計) を記録のある日の分だけ返す"""
+        return [(day, sum(per_day.values()))
+                for day, per_day in self._day_tasks.items()]
+
+    def day_total(self, day):
+        return sum(self._day_tasks.get(day, {}).values())
+
+    def total(self):
+        return self._total
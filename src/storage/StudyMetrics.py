@@ -0,0 +1,172 @@
+import datetime
+
+
+# 平均を出す直近の日数
+WINDOWS = (7, 30)
+
+
+def _ordinal(day):
+    """ISO 形式の日付を日番号にする"""
+    return datetime.date.fromisoformat(day).toordinal()
+
+
+class StudyMetrics:
+    """
+    日ごとの勉強時間(秒)から、連続日数・直近 7/30 日の平均・自己ベストを保つ。
+
+    記録を1件足すたびに O(1) で更新し、過去の記録は読み直さない。
+    直近の平均の窓は日付が進んだ分だけずらす（1日あたり O(1)）。
+    記録が減るとき（日のリセット・タスクの削除）は build() で作り直す。
+    recompute() は全日付を数え直す検証用の経路で、snapshot() と同じ辞書を返す。
+    """
+    def __init__(self):
+        # 日番号 -> その日の合計(秒)
+        self._days = {}
+        # 最後の連続の最終日と、その連続日数
+        self._streak_end = None
+        self._streak = 0
+        self._best_streak = 0
+        # 一番勉強した日 (日番号, 秒)
+        self._best_day = None
+        # 窓の最終日と、窓ごとの合計(秒)。最初に平均を聞かれたときに作る
+        self._window_end = None
+        self._window_sums = {width: 0 for width in WINDOWS}
+
+    @classmethod
+    def build(cls, day_totals):
+        """(日付, 秒) の並びから作る（同じ日付が何度あってもよい）"""
+        metrics = cls()
+        totals = {}
+        for day, seconds in day_totals:
+            ordinal = _ordinal(day)
+            totals[ordinal] = totals.get(ordinal, 0) + seconds
+        # 日付順に足せば連続日数は伸ばすだけで決まる
+        for ordinal in sorted(totals):
+            metrics._add(ordinal, totals[ordinal])
+        return metrics
+
+    def add(self, day, seconds):
+        """day (ISO 形式の日付) に seconds 秒の記録を足す"""
+        if seconds > 0:
+            self._add(_ordinal(day), seconds)
+
+    def _add(self, ordinal, seconds):
+        previous = self._days.get(ordinal, 0)
+        total = previous + seconds
+        self._days[ordinal] = total
+
+        # 同じ秒数なら早い日を残す（recompute() と同じ結果にするため）
+        if (self._best_day is None
+                or (total, -ordinal) > (self._best_day[1], -self._best_day[0])):
+            self._best_day = (ordinal, total)
+        if self._window_end is not None:
+            for width in WINDOWS:
+                if self._window_end - width < ordinal <= self._window_end:
+                    self._window_sums[width] += seconds
+        if previous <= 0 < total:
+            self._activate(ordinal)
+
+    def _activate(self, ordinal):
+        """ordinal の日に初めて記録が付いたので連続日数を伸ばす"""
+        end = self._streak_end
+        if end is not None and ordinal == end + 1:
+            self._streak_end = ordinal
+            self._streak += 1
+        elif end is None or ordinal > end:
+            self._streak_end = ordinal
+            self._streak = 1
+        else:
+            # 過去の日が後から埋まった（再起動後に締めた記録など）。
+            # その日の前後に続いている日数だけを数える
+            after = self._run(ordinal, 1)
+            run = 1 + self._run(ordinal, -1) + after
+            if ordinal + after == end:
+                self._streak = run
+            self._best_streak = max(self._best_streak, run)
+        self._best_streak = max(self._best_streak, self._streak)
+
+    def _run(self, ordinal, step):
+        """ordinal の隣から step 方向に記録が続いている日数"""
+        count = 0
+        ordinal += step
+        while self._days.get(ordinal, 0) > 0:
+            count += 1
+            ordinal += step
+        return count
+
+    def _move_window(self, today):
+        """窓の最終日を today にする。進んだ日の分だけ足し引きする"""
+        end = self._window_end
+        if end == today:
+            return
+        if end is None or today < end or today - end >= max(WINDOWS):
+            for width in WINDOWS:
+                self._window_sums[width] = sum(
+                    self._days.get(ordinal, 0)
+                    for ordinal in range(today - width + 1, today + 1))
+        else:
+            for ordinal in range(end + 1, today + 1):
+                seconds = self._days.get(ordinal, 0)
+                for width in WINDOWS:
+                    self._window_sums[width] += \
+                        seconds - self._days.get(ordinal - width, 0)
+        self._window_end = today
+
+    def snapshot(self, today=None):
+        """
+        今の値をまとめて返す。
+
+        Returns:
+            dict: streak(今日か昨日まで続いている連続日数), best_streak,
+            average_7, average_30(直近の1日あたりの秒), best_day(ISO 形式
+            の日付か None), best_day_seconds
+        """
+        today = (today or datetime.date.today()).toordinal()
+        self._move_window(today)
+        streak = 0
+        if self._streak_end is not None and today - 1 <= self._streak_end:
+            streak = self._streak
+        return self._result(
+            streak, self._best_streak,
+            {width: self._window_sums[width] for width in WINDOWS},
+            self._best_day)
+
+    @classmethod
+    def recompute(cls, day_totals, today=None):
+        """(日付, 秒) の並びから全部数え直して snapshot() と同じ辞書を返す"""
+        today = (today or datetime.date.today()).toordinal()
+        totals = {}
+        for day, seconds in day_totals:
+            ordinal = _ordinal(day)
+            totals[ordinal] = totals.get(ordinal, 0) + seconds
+        active = sorted(ordinal for ordinal, seconds in totals.items()
+                        if seconds > 0)
+
+        best_streak = run = 0
+        previous = None
+        for ordinal in active:
+            run = run + 1 if previous == ordinal - 1 else 1
+            best_streak = max(best_streak, run)
+            previous = ordinal
+        streak = run if active and today - 1 <= active[-1] else 0
+
+        sums = {width: sum(totals.get(ordinal, 0)
+                           for ordinal in range(today - width + 1, today + 1))
+                for width in WINDOWS}
+        best_day = None
+        for ordinal in sorted(totals):
+            if best_day is None or totals[ordinal] > best_day[1]:
+                best_day = (ordinal, totals[ordinal])
+        return cls._result(streak, best_streak, sums, best_day)
+
+    @staticmethod
+    def _result(streak, best_streak, sums, best_day):
+        return {
+            "streak": streak,
+            "best_streak": best_streak,
+            "average_7": sums[7] / 7,
+            "average_30": sums[30] / 30,
+            "best_day": (datetime.date.fromordinal(best_day[0]).isoformat()
+                         if best_day else None),
+            "best_day_seconds": best_day[1] if best_day else 0,
+        }
@@ -0,0 +1,75 @@
+import datetime
+
+
+class StudyQuery:
+    """
+    勉強時間の索引 (StudyIndex) を期間とタスクで絞り込んで引く。
+
+    日付は ISO 形式の文字列か datetime.date で渡す。期間は両端を含む。
+    tasks は task_id の集まりで、None なら全ての記録（タスク無しの記録も含む）。
+    期間は索引の並んだ日付を二分探索して、その間の日だけを見る (O(log n + k))。
+    """
+    def __init__(self, index):
+        self.index = index
+
+    def total(self, start=None, end=None, tasks=None):
+        """期間内の合計(秒)"""
+        if tasks is not None:
+            tasks = set(tasks)
+        if start is None and end is None and tasks is not None \
+                and None not in tasks:
+            # 全期間のタスク別の合計は索引が持っている（タスク無しの記録は持たない）
+            return sum(self.index.task_total(task_id) for task_id in tasks)
+        return sum(seconds for _, seconds in self._days(start, end, tasks))
+
+    def daily(self, start, end, tasks=None):
+        """
+        start から end までの (日付, 秒) を1日ずつ返す（記録の無い日は 0）。
+        1週間分の推移などに使う。
+        """
+        totals = dict(self._days(start, end, tasks))
+        day = _to_date(start)
+        last = _to_date(end)
+        series = []
+        while day <= last:
+            iso = day.isoformat()
+            series.append((iso, totals.get(iso, 0)))
+            day += datetime.timedelta(days=1)
+        return series
+
+    def by_task(self, start=None, end=None):
+        """期間内の {task_id: 秒}（タスク無しの記録は None にまとめる）"""
+        totals = {}
+        for _, per_day in self.index.days_between(_to_iso(start),
+                                                  _to_iso(end)):
+            for task_id, seconds in per_day.items():
+                totals[task_id] = totals.get(task_id, 0) + seconds
+        return totals
+
+    def _days(self, start, end, tasks):
+        """期間内の記録のある日の (日付, 秒)"""
+        if tasks is not None:
+            tasks = set(tasks)
+        for day, per_day in self.index.days_between(_to_iso(start),
+                                                    _to_iso(end)):
+            if tasks is None:
+                seconds = sum(per_day.values())
+            elif len(tasks) < len(per_day):
+                seconds = sum(per_day.get(task_id, 0) for task_id in tasks)
+            else:
+                seconds = sum(value for task_id, value in per_day.items()
+                              if task_id in tasks)
+            if seconds:
+                yield day, seconds
+
+
+def _to_iso(day):
+    if day is None or isinstance(day, str):
+        return day
+    return day.isoformat()
+
+
+def _to_date(day):
+    if isinstance(day, str):
+        return datetime.date.fromisoformat(day)
+    return day
@@ -0,0 +1,551 @@
+import datetime
+import os
+import sqlite3
+import sys
+import time
+
+from .migration import LEGACY_TASKS_IMPORTED
+
+
+# タスクとして保存を許可する列
+TASK_COLUMNS = ("text", "detail", "checked", "urgency")
+
+# データベースの形式の版。PRAGMA user_version に記録する
+SCHEMA_VERSION = 6
+
+
+def parse_group(detail):
+    """詳細の先頭に [グループ名] の形式で書いてあればグループ名を返す"""
+    detail = detail or ""
+    if detail.strip().startswith('[') and ']' in detail:
+        end_bracket = detail.find(']')
+        return detail[1:end_bracket].strip()
+    return ""
+
+
+def default_db_path() -> str:
+    """
+    タスクを保存する SQLite ファイルのパスを返す。
+    環境変数 TASKMANAGER_DB があればそちらを優先する。
+    """
+    override = os.environ.get("TASKMANAGER_DB")
+    if override:
+        return override
+
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA", os.path.expanduser("~"))
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get("XDG_DATA_HOME",
+                              os.path.expanduser("~/.local/share"))
+    return os.path.join(base, "CHU1PC", "TaskManagerApp", "tasks.db")
+
+
+class TaskStore:
+    """
+    タスクを1行ずつ読み書きする SQLite のストア。
+    追加・チェック・編集・削除はそれぞれ対象の1行だけを書き換える。
+    勉強時間は追記のみのセッションログ（開始時刻と秒数）として保存し、
+    日別・タスク別の合計はインデックスを使って集計する。
+    詳細の先頭の [グループ名] は詳細を書き込むときに取り出して grp 列に持つ。
+    表の形式の版は PRAGMA user_version に持ち、開いたときに足りない手順だけを実行する。
+    """
+    def __init__(self, path=None):
+        self.path = path or default_db_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)),
+                        exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+
+        # WAL にしておくと書き込み中でも読み出しがブロックされない
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+
+    # (版, その版にする手順, 説明)。古い順に並べ、今の版より新しいものだけを実行する。
+    # 版を持っていない (user_version = 0) 古いデータベースでも壊さないよう、
+    # どの手順も表や列がすでにあるかを確かめてから作り変える
+    MIGRATIONS = [
+        (1, "_create_tasks", "タスクの表"),
+        (2, "_create_sessions", "勉強時間のセッションログ"),
+        (3, "_add_group_column", "タスクのグループ列"),
+        (4, "_create_running_phase", "実行中のフェーズ"),
+        (5, "_convert_sessions_to_seconds", "セッションログを秒単位に"),
+        (6, "_add_phase_duration", "実行中のフェーズの長さ"),
+    ]
+
+    def _migrate(self):
+        """
+        PRAGMA user_version に記録した版から、MIGRATIONS を順に1回ずつ実行する。
+        最新の版ならこの PRAGMA を1回読むだけで、行には触れない。
+        手順ごとに1トランザクションで実行し、版もその中で書き換える。
+        表がまだ1つも無い新しいデータベースは、手順をたどらずに最新の形で作る。
+        環境変数 TASKMANAGER_STARTUP_TIMING があれば、かかった時間を標準エラーに出す。
+        """
+        current = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if current == SCHEMA_VERSION:
+            return
+        if current > SCHEMA_VERSION:
+            raise RuntimeError(
+                f"データベース {self.path} は新しいバージョンのアプリで"
+                f"保存されています (版 {current} > {SCHEMA_VERSION})")
+
+        verbose = bool(os.environ.get("TASKMANAGER_STARTUP_TIMING"))
+        started = time.perf_counter()
+        if current == 0 and self._is_empty():
+            self._run_step(self._create_schema, SCHEMA_VERSION)
+            if verbose:
+                print(f"create v{SCHEMA_VERSION}: "
+                      f"{(time.perf_counter() - started) * 1000:.1f} ms",
+                      file=sys.stderr)
+            return
+
+        for version, step, description in self.MIGRATIONS:
+            if version <= current:
+                continue
+            step_started = time.perf_counter()
+            self._run_step(getattr(self, step), version)
+            if verbose:
+                print(f"migrate v{version} {description}: "
+                      f"{(time.perf_counter() - step_started) * 1000:.1f} ms",
+                      file=sys.stderr)
+        if verbose:
+            print(f"migrate v{current} -> v{SCHEMA_VERSION}: "
+                  f"{(time.perf_counter() - started) * 1000:.1f} ms",
+                  file=sys.stderr)
+
+    def _run_step(self, step, version):
+        """step を1トランザクションで実行し、版を version にする"""
+        self.conn.execute("BEGIN")
+        try:
+            step()
+            self.conn.execute(f"PRAGMA user_version = {version}")
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+
+    def _is_empty(self):
+        """表が1つも無い（作ったばかりの）データベースか"""
+        row = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite_%' LIMIT 1").fetchone()
+        return row is None
+
+    def _create_schema(self):
+        """新しいデータベースに最新の版の表と索引をまとめて作る"""
+        self.conn.execute("""
+            CREATE TABLE tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                position INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                detail TEXT NOT NULL DEFAULT '',
+                checked INTEGER NOT NULL DEFAULT 0,
+                urgency TEXT NOT NULL DEFAULT 'normal',
+                grp TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX idx_tasks_grp ON tasks (grp)")
+        self.conn.execute("""
+            CREATE TABLE meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        self._create_seconds_sessions("sessions")
+        self._create_session_indexes()
+        self._create_phase_table()
+
+    # -------------------------------------------------------------------------
+    # 各版への手順（トランザクションは _migrate が張るのでここではコミットしない）
+    # -------------------------------------------------------------------------
+
+    def _create_tasks(self):
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                position INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                detail TEXT NOT NULL DEFAULT '',
+                checked INTEGER NOT NULL DEFAULT 0,
+                urgency TEXT NOT NULL DEFAULT 'normal'
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+
+    def _create_sessions(self):
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id INTEGER PRIMARY KEY,
+                task_id INTEGER,
+                day TEXT NOT NULL,
+                start INTEGER,
+                end INTEGER,
+                minutes INTEGER NOT NULL
+            )
+        """)
+        self._create_session_indexes()
+
+    def _create_session_indexes(self):
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sessions_day ON sessions (day)")
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sessions_task_day "
+            "ON sessions (task_id, day)")
+
+    def _add_group_column(self):
+        """grp 列の無い古いデータベースに列を足し、既存の詳細から埋める"""
+        columns = {row["name"] for row in
+                   self.conn.execute("PRAGMA table_info(tasks)")}
+        if "grp" not in columns:
+            self.conn.execute(
+                "ALTER TABLE tasks ADD COLUMN grp TEXT NOT NULL DEFAULT ''")
+            rows = self.conn.execute(
+                "SELECT id, detail FROM tasks "
+                "WHERE detail LIKE '%[%'").fetchall()
+            self.conn.executemany(
+                "UPDATE tasks SET grp = ? WHERE id = ?",
+                [(parse_group(row["detail"]), row["id"]) for row in rows])
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_grp ON tasks (grp)")
+
+    def _create_running_phase(self):
+        # 版 4 の形（duration が無い）。版 6 の _add_phase_duration で作り直す
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS running_phase (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                phase TEXT NOT NULL,
+                running INTEGER NOT NULL,
+                started_at REAL,
+                deadline REAL,
+                remaining REAL NOT NULL,
+                task_id INTEGER
+            )
+        """)
+
+    def _convert_sessions_to_seconds(self):
+        """
+        分単位 (start, end, minutes) の古いセッションログを秒単位に変換する。
+        終了時刻は日付と開始時刻・秒数から分かるので持たない。
+        """
+        columns = {row["name"] for row in
+                   self.conn.execute("PRAGMA table_info(sessions)")}
+        if "minutes" not in columns:
+            return
+        self._create_seconds_sessions("sessions_seconds")
+        self.conn.execute(
+            "INSERT INTO sessions_seconds (id, task_id, day, start, seconds) "
+            "SELECT id, task_id, day, IFNULL(start, end - minutes * 60), "
+            "minutes * 60 FROM sessions")
+        self.conn.execute("DROP TABLE sessions")
+        self.conn.execute("ALTER TABLE sessions_seconds RENAME TO sessions")
+        # 索引は古い表と一緒に消えたので作り直す
+        self._create_session_indexes()
+
+    def _add_phase_duration(self):
+        """
+        フェーズの長さ (duration) の無い記録からは進んだ時間が分からないので、
+        途中のフェーズは引き継がずに表を作り直す。
+        """
+        columns = {row["name"] for row in
+                   self.conn.execute("PRAGMA table_info(running_phase)")}
+        if "duration" in columns:
+            return
+        self.conn.execute("DROP TABLE IF EXISTS running_phase")
+        self._create_phase_table()
+
+    def _create_seconds_sessions(self, name):
+        """秒単位のセッションログの表を name という名前で作る"""
+        self.conn.execute(f"""
+            CREATE TABLE {name} (
+                id INTEGER PRIMARY KEY,
+                task_id INTEGER,
+                day TEXT NOT NULL,
+                start INTEGER,
+                seconds INTEGER NOT NULL
+            )
+        """)
+
+    def _create_phase_table(self):
+        # 実行中のポモドーロ（1行だけ）。クラッシュやスリープの後に続きから再開する
+        self.conn.execute("""
+            CREATE TABLE running_phase (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                phase TEXT NOT NULL,
+                running INTEGER NOT NULL,
+                started_at REAL,
+                deadline REAL,
+                remaining REAL NOT NULL,
+                duration REAL NOT NULL,
+                task_id INTEGER
+            )
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def data_version(self):
+        """
+        他の接続（コマンドラインのツールなど）が書き込むたびに変わる番号。
+        自分の接続での書き込みでは変わらない。
+        """
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # -------------------------------------------------------------------------
+    # タスク
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _row_to_task(row):
+        return {
+            "id": row["id"],
+            "text": row["text"],
+            "detail": row["detail"],
+            "checked": bool(row["checked"]),
+            "urgency": row["urgency"],
+            "group": row["grp"],
+        }
+
+    def load_tasks(self):
+        """保存されている全タスクを並び順どおりに返す"""
+        rows = self.conn.execute(
+            "SELECT id, text, detail, checked, urgency, grp FROM tasks "
+            "ORDER BY position, id")
+        return [self._row_to_task(row) for row in rows]
+
+    def get_task(self, task_id):
+        row = self.conn.execute(
+            "SELECT id, text, detail, checked, urgency, grp FROM tasks "
+            "WHERE id = ?", (task_id,)).fetchone()
+        return self._row_to_task(row) if row else None
+
+    def group_task_ids(self, group):
+        """グループ group のタスクの id を並び順どおりに返す"""
+        rows = self.conn.execute(
+            "SELECT id FROM tasks WHERE grp = ? ORDER BY position, id",
+            (group,))
+        return [row["id"] for row in rows]
+
+    def add_task(self, text, urgency="normal", detail="", checked=False):
+        """タスクを末尾に追加して、その id を返す"""
+        with self.conn:
+            return self._insert_task(text, urgency, detail, checked)
+
+    def add_tasks(self, entries):
+        """複数のタスクを1トランザクションで追加する"""
+        with self.conn:
+            return [self._insert_task(entry.get("text", ""),
+                                      entry.get("urgency", "normal"),
+                                      entry.get("detail", ""),
+                                      entry.get("checked", False))
+                    for entry in entries]
+
+    def replace_tasks(self, entries):
+        """
+        全タスクを entries で置き換える（restore.py 用）。
+
+        同じ名前のタスクは id をそのまま使うので、勉強時間の記録も付いたままになる。
+        entries に無いタスクは削除し、その記録はタスク無しの記録として残す。
+        置き換えた後に QSettings の古いタスクを取り込み直さないよう、取り込み済みにする。
+        """
+        with self.conn:
+            # 名前 -> 今ある id（未完了・並び順の早いものから使う）
+            existing = {}
+            for row in self.conn.execute(
+                    "SELECT id, text FROM tasks "
+                    "ORDER BY checked, position, id"):
+                existing.setdefault(row["text"], []).append(row["id"])
+
+            ids = []
+            for entry in entries:
+                same_name = existing.get(entry.get("text", ""))
+                ids.append(same_name.pop(0) if same_name else None)
+            removed = [(task_id,) for same_name in existing.values()
+                       for task_id in same_name]
+            self.conn.executemany(
+                "UPDATE sessions SET task_id = NULL WHERE task_id = ?",
+                removed)
+            self.conn.executemany("DELETE FROM tasks WHERE id = ?", removed)
+
+            for position, (task_id, entry) in enumerate(zip(ids, entries)):
+                detail = entry.get("detail", "") or ""
+                cur = self.conn.execute(
+                    "INSERT OR REPLACE INTO tasks "
+                    "(id, position, text, detail, checked, urgency, grp) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (task_id, position, entry.get("text", ""), detail,
+                     int(bool(entry.get("checked", False))),
+                     entry.get("urgency", "normal") or "normal",
+                     parse_group(detail)))
+                ids[position] = cur.lastrowid
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (LEGACY_TASKS_IMPORTED, "1"))
+            return ids
+
+    def _insert_task(self, text, urgency, detail, checked):
+        cur = self.conn.execute(
+            "INSERT INTO tasks (position, text, detail, checked, urgency, grp) "
+            "VALUES ((SELECT IFNULL(MAX(position), -1) + 1 FROM tasks), "
+            "?, ?, ?, ?, ?)",
+            (text, detail or "", int(bool(checked)), urgency or "normal",
+             parse_group(detail)))
+        return cur.lastrowid
+
+    def update_task(self, task_id, **fields):
+        """指定したタスクの指定した列だけを更新する"""
+        unknown = set(fields) - set(TASK_COLUMNS)
+        if unknown:
+            raise ValueError(f"unknown task fields: {sorted(unknown)}")
+        if not fields:
+            return
+
+        if "checked" in fields:
+            fields["checked"] = int(bool(fields["checked"]))
+        if "detail" in fields:
+            # グループは詳細を書き込むときに1回だけ取り出しておく
+            fields["grp"] = parse_group(fields["detail"])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self.conn:
+            self.conn.execute(
+                f"UPDATE tasks SET {assignments} WHERE id = ?",
+                (*fields.values(), task_id))
+
+    def find_task_id(self, text):
+        """名前が text のタスクの id を返す（未完了のものを優先）"""
+        row = self.conn.execute(
+            "SELECT id FROM tasks WHERE text = ? "
+            "ORDER BY checked, position, id LIMIT 1", (text,)).fetchone()
+        return row["id"] if row else None
+
+    def delete_task(self, task_id):
+        """タスクとその勉強時間の記録を削除する"""
+        with self.conn:
+            self.conn.execute("DELETE FROM sessions WHERE task_id = ?",
+                              (task_id,))
+            self.conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    # -------------------------------------------------------------------------
+    # 勉強時間のセッションログ
+    # -------------------------------------------------------------------------
+
+    def record_session(self, task_id, seconds, start=None, end=None):
+        """
+        勉強したセッションを1件追記する。
+
+        Args:
+            task_id (int | None): 勉強したタスクの id
+            seconds (int): 実際に勉強した時間(秒)
+            start (int | None): 開始時刻(UNIX 時間, 秒)。省略時は end から逆算
+            end (int | None): 終了時刻(UNIX 時間, 秒)。省略時は現在時刻
+
+        Returns:
+            str: 記録した日付(終了した日, ISO 形式)
+        """
+        if end is None:
+            end = int(time.time())
+        if start is None:
+            start = end - seconds
+        day = datetime.date.fromtimestamp(end).isoformat()
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO sessions (task_id, day, start, seconds) "
+                "VALUES (?, ?, ?, ?)",
+                (task_id, day, start, seconds))
+        return day
+
+    def session_totals(self):
+        """(task_id, 日付, 秒) をタスク×日ごとに集計して返す"""
+        return self.conn.execute(
+            "SELECT task_id, day, SUM(seconds) FROM sessions "
+            "GROUP BY task_id, day").fetchall()
+
+    def session_columns(self):
+        """
+        セッションログを集計しやすい列の形で全件返す。
+        統計画面が配列にして集計するので、行ごとの変換は SQL では行わない。
+
+        Returns:
+            tuple[list, list, list, list]: (task_id, 日付, 開始時刻, 秒)。
+            task_id が無い記録は 0、開始時刻が分からない記録は -1
+        """
+        # sqlite3.Row を作らない分だけ全件の読み出しが速い
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(
+            "SELECT IFNULL(task_id, 0), day, IFNULL(start, -1), seconds "
+            "FROM sessions").fetchall()
+        if not rows:
+            return [], [], [], []
+        return tuple(list(column) for column in zip(*rows))
+
+    def delete_sessions_on(self, day):
+        """day (ISO 形式の日付) の勉強時間の記録を全て削除する"""
+        with self.conn:
+            self.conn.execute("DELETE FROM sessions WHERE day = ?", (day,))
+
+    # -------------------------------------------------------------------------
+    # 実行中のフェーズ
+    # -------------------------------------------------------------------------
+
+    def save_running_phase(self, snapshot):
+        """実行中のフェーズ (PomodoroEngine.snapshot()) を上書き保存する"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO running_phase "
+                "(id, phase, running, started_at, deadline, remaining, "
+                "duration, task_id) VALUES (0, ?, ?, ?, ?, ?, ?, ?)",
+                (snapshot["phase"], int(snapshot["running"]),
+                 snapshot["started_at"], snapshot["deadline"],
+                 snapshot["remaining"], snapshot["duration"],
+                 snapshot["task_id"]))
+
+    def load_running_phase(self):
+        """保存されている実行中のフェーズを返す。無ければ None"""
+        row = self.conn.execute(
+            "SELECT phase, running, started_at, deadline, remaining, "
+            "duration, task_id FROM running_phase WHERE id = 0").fetchone()
+        if row is None:
+            return None
+        snapshot = dict(row)
+        snapshot["running"] = bool(snapshot["running"])
+        return snapshot
+
+    def clear_running_phase(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM running_phase")
+
+    # -------------------------------------------------------------------------
+    # メタ情報
+    # -------------------------------------------------------------------------
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, value))
+
+
+_store = None
+
+
+def get_store():
+    """プロセス内で共有する TaskStore を返す"""
+    global _store
+    if _store is None:
+        _store = TaskStore()
+    return _store
@@ -0,0 +1,6 @@
+from .TaskStore import TaskStore, get_store, parse_group  # type: ignore # noqa
+from .StudyIndex import StudyIndex  # type: ignore # noqa
+from .StudyMetrics import StudyMetrics  # type: ignore # noqa
+from .StudyQuery import StudyQuery  # type: ignore # noqa
+from .SearchIndex import SearchIndex  # type: ignore # noqa
+from .migration import import_legacy_settings  # type: ignore # noqa
\ No newline at end of file
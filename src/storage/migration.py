@@ -0,0 +1,76 @@
+LEGACY_TASKS_IMPORTED = "legacy_tasks_imported"
+LEGACY_SESSIONS_IMPORTED = "legacy_sessions_imported"
+
+
+def import_legacy_settings(store, settings):
+    """
+    QSettings に保存されていた旧形式のタスクと勉強時間を
+    一度だけ SQLite のストアへ取り込む。
+
+    Args:
+        store (TaskStore): 取り込み先のストア
+        settings (QSettings): QSettings("CHU1PC", "TaskManagerApp")
+    """
+    _import_legacy_tasks(store, settings)
+    _import_legacy_sessions(store, settings)
+
+
+def _import_legacy_tasks(store, settings):
+    """QSettings の "tasks" をタスクの表へ取り込む"""
+    if store.get_meta(LEGACY_TASKS_IMPORTED):
+        return 0
+
+    stored = settings.value("tasks", []) or []
+    entries = [entry for entry in stored if isinstance(entry, dict)]
+
+    # 取り込みと取り込み済みの印は同じトランザクションで書く
+    with store.conn:
+        for entry in entries:
+            store._insert_task(entry.get("text", ""),
+                               entry.get("urgency", "normal"),
+                               entry.get("detail", ""),
+                               entry.get("checked", False))
+        store.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (LEGACY_TASKS_IMPORTED, "1"))
+    return len(entries)
+
+
+def _import_legacy_sessions(store, settings):
+    """
+    "task_study_time" ({タスク名: {日付: 分}}) をセッションログへ取り込む。
+    "study_time" ({日付: 分}) のうちどのタスクにも属さない分は
+    task_id なしの記録として残す。
+    """
+    if store.get_meta(LEGACY_SESSIONS_IMPORTED):
+        return 0
+
+    task_records = settings.value("task_study_time", {}) or {}
+    day_records = settings.value("study_time", {}) or {}
+
+    rows = []
+    per_day = {}
+    for name, per_task in task_records.items():
+        if not isinstance(per_task, dict):
+            continue
+        task_id = store.find_task_id(name)
+        for day, minutes in per_task.items():
+            minutes = int(minutes)
+            if minutes <= 0:
+                continue
+            rows.append((task_id, day, minutes))
+            per_day[day] = per_day.get(day, 0) + minutes
+
+    for day, minutes in day_records.items():
+        rest = int(minutes) - per_day.get(day, 0)
+        if rest > 0:
+            rows.append((None, day, rest))
+
+    with store.conn:
+        store.conn.executemany(
+            "INSERT INTO sessions (task_id, day, seconds) VALUES (?, ?, ?)",
+            [(task_id, day, minutes * 60) for task_id, day, minutes in rows])
+        store.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (LEGACY_SESSIONS_IMPORTED, "1"))
+    return len(rows)
@@ -0,0 +1,127 @@
+"""
+タスクと勉強時間の記録を1行ずつ書き出し・取り込みする。
+どちらもカーソルや入力を順に流すだけなので、件数が多くてもメモリは一定で済む。
+"""
+from .TaskStore import parse_group
+
+
+# 種類 -> 書き出す列
+FIELDS = {
+    # タスク
+    "tasks": ("id", "position", "text", "detail", "checked", "urgency"),
+    # セッションログ（1回の作業ごと）
+    "sessions": ("id", "task_id", "day", "start", "seconds"),
+    # 日別・タスク別の合計
+    "daily": ("task_id", "day", "seconds"),
+}
+
+EXPORT_QUERIES = {
+    "tasks": "SELECT id, position, text, detail, checked, urgency FROM tasks "
+             "ORDER BY position, id",
+    "sessions": "SELECT id, task_id, day, start, seconds FROM sessions "
+                "ORDER BY id",
+    "daily": "SELECT task_id, day, SUM(seconds) FROM sessions "
+             "GROUP BY day, task_id ORDER BY day, task_id",
+}
+
+# 1トランザクションでまとめて書き込む行数
+BATCH_SIZE = 1000
+
+
+def export_rows(store, kind):
+    """
+    kind の行を FIELDS[kind] の順のタプルで1行ずつ返す。
+    fetchall() はせず、カーソルから読んだ分だけ渡す。
+    """
+    cursor = store.conn.cursor()
+    cursor.row_factory = None
+    yield from cursor.execute(EXPORT_QUERIES[kind])
+
+
+def import_rows(store, kind, records, batch_size=BATCH_SIZE):
+    """
+    列名 -> 値 の辞書を1件ずつ取り込み、batch_size 件ごとにコミットする。
+
+    tasks と sessions は id が同じ行を上書きするので、書き出したものを
+    もう一度取り込んでも増えない。daily は合計を1件のセッションとして足す。
+
+    Returns:
+        int: 取り込んだ件数
+    """
+    insert = {
+        "tasks": _insert_tasks,
+        "sessions": _insert_sessions,
+        "daily": _insert_daily,
+    }[kind]
+
+    # 末尾に足すタスクの並び順。行ごとに MAX(position) を引かないよう先に1回だけ読む
+    state = {"position": store.conn.execute(
+        "SELECT IFNULL(MAX(position), -1) + 1 FROM tasks").fetchone()[0]}
+
+    count = 0
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            count += _commit(store, insert, batch, state)
+            batch = []
+    if batch:
+        count += _commit(store, insert, batch, state)
+    return count
+
+
+def _commit(store, insert, batch, state):
+    with store.conn:
+        insert(store.conn, batch, state)
+    return len(batch)
+
+
+def _insert_tasks(conn, batch, state):
+    rows = []
+    for record in batch:
+        position = _int(record.get("position"))
+        if position is None:
+            position = state["position"]
+        state["position"] = max(state["position"], position + 1)
+        detail = record.get("detail") or ""
+        rows.append((_int(record.get("id")), position,
+                     record.get("text") or "", detail,
+                     int(_bool(record.get("checked"))),
+                     record.get("urgency") or "normal", parse_group(detail)))
+    conn.executemany(
+        "INSERT INTO tasks (id, position, text, detail, checked, urgency, grp) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (id) DO UPDATE SET position = excluded.position, "
+        "text = excluded.text, detail = excluded.detail, "
+        "checked = excluded.checked, urgency = excluded.urgency, "
+        "grp = excluded.grp", rows)
+
+
+def _insert_sessions(conn, batch, state):
+    conn.executemany(
+        "INSERT OR REPLACE INTO sessions (id, task_id, day, start, seconds) "
+        "VALUES (?, ?, ?, ?, ?)",
+        [(_int(record.get("id")), _int(record.get("task_id")), record["day"],
+          _int(record.get("start")), _int(record["seconds"]))
+         for record in batch])
+
+
+def _insert_daily(conn, batch, state):
+    conn.executemany(
+        "INSERT INTO sessions (task_id, day, start, seconds) "
+        "VALUES (?, ?, NULL, ?)",
+        [(_int(record.get("task_id")), record["day"], _int(record["seconds"]))
+         for record in batch])
+
+
+def _int(value):
+    """CSV の空欄や JSON の null は None にする"""
+    if value is None or value == "":
+        return None
+    return int(value)
+
+
+def _bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return bool(value)
@@ -1,15 +1,17 @@
 import datetime
 
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLineEdit, QPushButton,
-                             QHBoxLayout, QListWidget, QListWidgetItem, QFrame,
+                             QHBoxLayout, QListView, QFrame,
                              QTextEdit, QMenu, QGridLayout, QGroupBox, QLabel,
                              QMessageBox, QComboBox, QDialog
                              )
 from PyQt6.QtGui import QAction
-from PyQt6.QtCore import Qt, QSettings
+from PyQt6.QtCore import Qt, QSettings, QModelIndex
 
+from repository import get_repository
 from .TaskEdit import TaskEditDialog
 from .Taskdelete import TaskDeleteDialog
+from .TaskModel import TaskListModel, TaskSortProxy
 
 
 class TasksWidget(QWidget):
@@ -17,6 +19,19 @@ class TasksWidget(QWidget):
         super().__init__()
         self.settings = QSettings("CHU1PC", "TaskManagerApp")
 
+        # タスクは全画面で共有するリポジトリから読み、変更の差分だけ反映する
+        self.repository = get_repository()
+
+        # リポジトリのタスクを並べるモデルと、並び替え用のプロキシ
+        # （モデルの差分反映が先に走るように、画面側の接続より先に作る）
+        self.task_model = TaskListModel(self.repository, self)
+        self.task_proxy = TaskSortProxy(self)
+        self.task_proxy.setSourceModel(self.task_model)
+
+        self.repository.task_changed.connect(self._on_task_changed)
+        self.repository.study_time_changed.connect(
+            self.update_study_time_display)
+
         main_layout = QHBoxLayout(self)
 
         left_panel = QWidget(self)
@@ -112,19 +127,36 @@ class TasksWidget(QWidget):
         self.urgency_select.addItem("💡 非緊急×重要", "not_urgent_important")
         self.urgency_select.addItem("📝 非緊急×非重要", "not_urgent_not_important")
 
+        # 検索欄（タスク名と詳細から探す）
+        self.search_line = QLineEdit(self)
+        self.search_line.setPlaceholderText("🔍 タスクを検索…")
+        self.search_line.setClearButtonEnabled(True)
+        self.search_line.setStyleSheet("""
+            color: #ffffff;
+            background-color: #333;
+            border-radius: 5px;
+            padding: 6px;
+            font-size: 13px;
+        """)
+        self.search_line.textChanged.connect(self.search_tasks)
+
         # タスク表示欄
-        self.task_list = QListWidget(self)
+        self.task_list = QListView(self)
+        self.task_list.setModel(self.task_proxy)
+        # 全行同じ高さにしておくと大量のタスクでも描画が軽い
+        self.task_list.setUniformItemSizes(True)
         self.task_list.setContextMenuPolicy(
             Qt.ContextMenuPolicy.CustomContextMenu)
         self.task_list.customContextMenuRequested.connect(
             self.show_context_menu)
         self.task_list.setStyleSheet("color: #ffffff;")
-        self.task_list.itemChanged.connect(self._on_item_changed)
-        self.task_list.currentItemChanged.connect(self.on_item_selected)
-        for i in range(self.task_list.count()):
-            item = self.task_list.item(i)
-            item.setData(Qt.ItemDataRole.UserRole + 2, item.checkState())
-            item.setData(Qt.ItemDataRole.UserRole + 3, item.text())
+        self.task_list.selectionModel().currentChanged.connect(
+            self.on_item_selected)
+        # 読み直しでモデルがまるごと入れ替わると選択が外れるので、選び直す
+        self._reselect_task_id = None
+        self.task_proxy.modelAboutToBeReset.connect(
+            self._remember_current_task)
+        self.task_proxy.modelReset.connect(self._restore_current_task)
 
         # タスク表示並び替え変更用ボタン
         self.task_sort = QComboBox()
@@ -228,7 +260,8 @@ class TasksWidget(QWidget):
             font-size: 14px;
         """)
 
-        self._load_tasks()
+        # タスク読み込み後に保存された並び順を適用
+        self.sort_tasks()
         self.update_study_time_display()
 
         # ---------------------------------------------------------------------
@@ -262,6 +295,7 @@ class TasksWidget(QWidget):
         mid_layout.addLayout(input_layout)
         mid_layout.addWidget(self.urgency_select)
         mid_layout.addWidget(self.task_sort)
+        mid_layout.addWidget(self.search_line)
         mid_layout.addWidget(self.task_list)
 
         right_layout.addWidget(self.urgency)
@@ -276,39 +310,59 @@ class TasksWidget(QWidget):
         main_layout.addWidget(separator1)
         main_layout.addWidget(right_panel, stretch=2)
 
-    def _save_tasks(self):
-        tasks = []
-        for i in range(self.task_list.count()):
-            item = self.task_list.item(i)
-            if item is not None:
-                tasks.append({
-                    "text": item.text(),
-                    "detail": item.data(Qt.ItemDataRole.UserRole),
-                    "checked": item.checkState() == Qt.CheckState.Checked,
-                    "urgency": item.data(Qt.ItemDataRole.UserRole + 1)
-                })
-        # 辞書のリストなら QSettings が QVariantList/QVariantMap に変換してくれる
-        self.settings.setValue("tasks", tasks)
-
-    def _load_tasks(self):
-        stored = self.settings.value("tasks", [])
-        for entry in stored:
-            item = QListWidgetItem(entry.get("text", ""))
-            # ダブルクリックで名前編集＆チェックＯＫにする
-            item.setFlags(item.flags()
-                          | Qt.ItemFlag.ItemIsEditable
-                          | Qt.ItemFlag.ItemIsUserCheckable)
-            item.setCheckState(
-                Qt.CheckState.Checked if entry.get("checked") else
-                Qt.CheckState.Unchecked
-            )
-            item.setData(Qt.ItemDataRole.UserRole, entry.get("detail", ""))
-            urgency = entry.get("urgency", "normal")
-            item.setData(Qt.ItemDataRole.UserRole + 1, urgency)
-            self.task_list.addItem(item)
+    def current_task_id(self):
+        """選択中のタスクの id を返す。選択されていなければ None"""
+        index = self.task_list.currentIndex()
+        if not index.isValid():
+            return None
+        return index.data(TaskListModel.TaskIdRole)
+
+    def _select_task(self, task_id):
+        """task_id のタスクを選択状態にする"""
+        row = self.task_model.row_of(task_id)
+        if row < 0:
+            return
+        index = self.task_proxy.mapFromSource(self.task_model.index(row))
+        self.task_list.setCurrentIndex(index)
+        self.task_list.scrollTo(index)
 
-        # タスク読み込み後に保存された並び順を適用
-        self.sort_tasks()
+    def _remember_current_task(self):
+        self._reselect_task_id = self.current_task_id()
+
+    def _restore_current_task(self):
+        """
+        選んでいたタスクを選び直す。無くなっていれば詳細欄を空にする
+        （選択が外れたまま詳細欄に入力されると、その入力は保存されないため）
+        """
+        task_id, self._reselect_task_id = self._reselect_task_id, None
+        if task_id is not None and self.repository.get(task_id) is not None:
+            self._select_task(task_id)
+        if self.current_task_id() is None:
+            self.on_item_selected(QModelIndex(), QModelIndex())
+
+    # -------------------------------------------------------------------------
+    # リポジトリからの通知（行の追加・変更・削除と並べ直しはモデルとプロキシが行う）
+    # -------------------------------------------------------------------------
+
+    def _on_task_changed(self, task_id, fields):
+        task = self.repository.get(task_id)
+        if task is None:
+            return
+
+        if self.current_task_id() == task_id:
+            if "urgency" in fields:
+                priority_display = \
+                    self._get_priority_display_text(task["urgency"])
+                self.urgency.setText(f"緊急度, 重要度:\n{priority_display}")
+            if ("detail" in fields and
+                    self.detail_edit.toPlainText() != task["detail"]):
+                self.detail_edit.blockSignals(True)
+                self.detail_edit.setPlainText(task["detail"])
+                self.detail_edit.blockSignals(False)
+
+    # -------------------------------------------------------------------------
+    # ユーザー操作
+    # -------------------------------------------------------------------------
 
     def on_add_clicked(self):
         task_text = self.input_line.text()
@@ -318,21 +372,12 @@ class TasksWidget(QWidget):
         # 選択された緊急度を取得
         priority_data = self.urgency_select.currentData()
 
-        item = QListWidgetItem(task_text)
-        item.setCheckState(Qt.CheckState.Unchecked)
-
+        # リポジトリに追加するとモデルに行が増え、並び順どおりの位置に入る
         # 詳細欄は空で初期化（緊急度情報は含めない）
-        item.setData(Qt.ItemDataRole.UserRole, "")
-
-        # カスタムデータとして緊急度も保存
-        item.setData(Qt.ItemDataRole.UserRole + 1, priority_data)
-
-        # リストにアイテムを追加
-        self.task_list.addItem(item)
-        self.sort_tasks()
+        task_id = self.repository.add_task(task_text, priority_data)
 
         # 追加したアイテムを選択して緊急度表示を更新
-        self.task_list.setCurrentItem(item)
+        self._select_task(task_id)
 
         # 入力欄をリセット
         self.input_line.clear()
@@ -341,12 +386,11 @@ class TasksWidget(QWidget):
         # 緊急度選択も通常に戻す
         self.urgency_select.setCurrentIndex(0)
 
-        self._save_tasks()
-
     def show_context_menu(self, pos):
-        item = self.task_list.itemAt(pos)
-        if not item:
+        index = self.task_list.indexAt(pos)
+        if not index.isValid():
             return
+        task_id = index.data(TaskListModel.TaskIdRole)
 
         menu = QMenu()
         edit_act = QAction("編集", self)
@@ -355,8 +399,8 @@ class TasksWidget(QWidget):
         menu.addAction(delete_act)
 
         # アクションにコールバックを紐付け
-        edit_act.triggered.connect(lambda: self.edit_task(item))
-        delete_act.triggered.connect(lambda: self.delete_task(item))
+        edit_act.triggered.connect(lambda: self.edit_task(task_id))
+        delete_act.triggered.connect(lambda: self.delete_task(task_id))
 
         # グローバル座標に変換してメニュー表示
         viewport = self.task_list.viewport()
@@ -364,11 +408,14 @@ class TasksWidget(QWidget):
             global_pos = viewport.mapToGlobal(pos)
             menu.exec(global_pos)
 
-    def edit_task(self, item: QListWidgetItem):
+    def edit_task(self, task_id):
         """タスク名と緊急度を編集"""
-        current_priority = item.data(Qt.ItemDataRole.UserRole + 1) or "normal"
+        task = self.repository.get(task_id)
+        if task is None:
+            return
+        current_priority = task["urgency"] or "normal"
 
-        dialog = TaskEditDialog(item.text(), current_priority, self)
+        dialog = TaskEditDialog(task["text"], current_priority, self)
 
         if dialog.exec() != QDialog.DialogCode.Accepted:
             return
@@ -378,38 +425,21 @@ class TasksWidget(QWidget):
             QMessageBox.warning(self, "エラー", "タスク名を入力してください")
             return
 
-        old_name = item.text()
-        new_name = values["name"]
-
-        # --- ここで task_study_time を旧名→新名へマイグレーション ---
-        if new_name != old_name:
-            task_study_records = self.settings.value("task_study_time", {})
-            if (isinstance(task_study_records, dict) and
-               old_name in task_study_records):
-                # 既存の新名データがあればマージ
-                merged = task_study_records.get(new_name, {})
-                for date, minutes in task_study_records[old_name].items():
-                    merged[date] = merged.get(date, 0) + minutes
-                task_study_records[new_name] = merged
-                del task_study_records[old_name]
-                self.settings.setValue("task_study_time", task_study_records)
-
-        # 表示と属性の更新
-        item.setText(new_name)
-        item.setData(Qt.ItemDataRole.UserRole + 1, values["priority_data"])
-
-        if self.task_list.currentItem() == item:
-            priority_display = \
-                self._get_priority_display_text(values["priority_data"])
-            self.urgency.setText(f"緊急度, 重要度:\n{priority_display}")
-
-        self.sort_tasks()
-        self._save_tasks()
+        # 勉強時間の記録はタスクの id に紐づいているので名前を変えるだけでよい
+        # 表示と並び替えはモデルとプロキシが行う
+        self.repository.update_task(
+            task_id,
+            text=values["name"],
+            urgency=values["priority_data"]
+        )
         self.update_study_time_display()
 
-    def delete_task(self, item: QListWidgetItem):
-        """アイテムを削除"""
-        task_name = item.text()
+    def delete_task(self, task_id):
+        """タスクを削除"""
+        task = self.repository.get(task_id)
+        if task is None:
+            return
+        task_name = task["text"]
 
         # ▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼
         # ▼▼▼ QMessageBox を使っていた部分を、以下に置き換えます ▼▼▼
@@ -425,41 +455,30 @@ class TasksWidget(QWidget):
         # ダイアログを実行し、結果（どのボタンが押されたか）を取得します
         # "はい"が押されたら Accepted、"キャンセル"なら Rejected が返ります
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            # 「はい」が押された場合の処理（この部分は変更なし）
-            task_study_records = self.settings.value("task_study_time", {})
-            if task_name in task_study_records:
-                deleted_task_time = task_study_records[task_name]
-                study_records = self.settings.value("study_time", {})
-                for date, minutes in deleted_task_time.items():
-                    if date in study_records:
-                        study_records[date] -= minutes
-                        if study_records[date] <= 0:
-                            del study_records[date]
-                self.settings.setValue("study_time", study_records)
-                del task_study_records[task_name]
-                self.settings.setValue("task_study_time", task_study_records)
-
-            row = self.task_list.row(item)
-            self.task_list.takeItem(row)
-
-            self.detail_edit.clear()
-            self._save_tasks()
-            self.update_study_time_display()
+            # 「はい」が押された場合の処理
+            # タスクの行と一緒にそのタスクのセッションログも削除され、
+            # リストからはモデルが行を取り除く
+            self.repository.remove_task(task_id)
 
     def on_item_selected(self, current, previous):
-        if current is None:
+        # 前のタスクの詳細の編集をここで確定させる
+        self.repository.flush()
+
+        if not current.isValid():
             self.detail_edit.clear()
             self.urgency.setText("緊急度, 重要度:\n📖普通")
+            self.update_study_time_display()
             return
 
-        # 通常の処理
-        detail = current.data(Qt.ItemDataRole.UserRole) or ""
-        self.detail_edit.blockSignals(True)
-        self.detail_edit.setPlainText(detail)
-        self.detail_edit.blockSignals(False)
+        # 通常の処理（同じ内容なら入れ直さず、カーソルの位置を保つ）
+        detail = current.data(TaskListModel.DetailRole) or ""
+        if self.detail_edit.toPlainText() != detail:
+            self.detail_edit.blockSignals(True)
+            self.detail_edit.setPlainText(detail)
+            self.detail_edit.blockSignals(False)
 
         # 緊急度表示を更新
-        priority_data = current.data(Qt.ItemDataRole.UserRole + 1) or "normal"
+        priority_data = current.data(TaskListModel.UrgencyRole) or "normal"
         priority_display = self._get_priority_display_text(priority_data)
         self.urgency.setText(f"緊急度, 重要度:\n{priority_display}")
 
@@ -478,110 +497,56 @@ class TasksWidget(QWidget):
 
     def on_detail_changed(self):
         """
-        詳細テキスト編集時は itemChanged をブロックして、
-        save() のみ実行する
+        詳細テキスト編集時はリポジトリを更新して、
+        そのタスクの詳細の書き込みを予約する
         """
-        item = self.task_list.currentItem()
-        if not item:
-            return
-
-        # 1) itemChanged シグナルをブロック
-        self.task_list.blockSignals(True)
-
-        # 2) ユーザーデータとして詳細を保存
-        item.setData(Qt.ItemDataRole.UserRole,
-                     self.detail_edit.toPlainText())
-
-        # 3) block 解除
-        self.task_list.blockSignals(False)
-
-        # 4) 保存のみ
-        self._save_tasks()
-
-    def _on_item_changed(self, item: QListWidgetItem):
-        """チェック変更なら sort&save、テキスト変更なら save のみ"""
-        # 1) 以前の状態を取得
-        old_check = item.data(Qt.ItemDataRole.UserRole + 2)
-        old_text = item.data(Qt.ItemDataRole.UserRole + 3)
-
-        # 2) 今の状態を取得
-        new_check = item.checkState()
-        new_text = item.text()
-
-        # 3) 変化のタイプで振り分け
-        if new_check != old_check:
-            # チェックが変わったとき
-            self.sort_tasks()
-            self._save_tasks()
-        elif new_text != old_text:
-            # テキストが変わったとき
-            self._save_tasks()
-        else:
-            # detail用の setData 等、関係ない変更
+        task_id = self.current_task_id()
+        if task_id is None:
             return
 
-        # 4) 新しい状態を保存して次回に備える
-        item.setData(Qt.ItemDataRole.UserRole + 2, new_check)
-        item.setData(Qt.ItemDataRole.UserRole + 3, new_text)
+        # 入力が落ち着いたらまとめて保存する
+        self.repository.update_task(
+            task_id,
+            defer=True,
+            detail=self.detail_edit.toPlainText()
+        )
 
     def update_study_time_display(self):
         """勉強時間表示を更新"""
-        # 勉強時間記録を取得
-        task_study_records = self.settings.value("task_study_time", {})
-
         # 日付の準備
         today = datetime.date.today().isoformat()
         yesterday = \
             (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
 
         # 選択中のタスクを取得
-        current_item = self.task_list.currentItem()
+        task_id = self.current_task_id()
 
-        if current_item:
-            task_name = current_item.text()
+        if task_id is not None:
+            # 勉強時間は集計済みの索引に期間とタスクで問い合わせる（索引は秒単位）
+            query = self.repository.query
 
             # このタスクの総合計勉強時間（今まで全て）
-            task_total_minutes = 0
-            if task_name in task_study_records:
-                task_total_minutes = \
-                    sum(task_study_records[task_name].values())
+            task_total_minutes = query.total(tasks=[task_id]) // 60
 
             task_hours, task_mins = divmod(task_total_minutes, 60)
             self.total_study_label.setText(f"総合計: {task_hours}時間{task_mins}分")
 
-            # このタスクの今日の勉強時間
-            today_task_minutes = 0
-            if (task_name in task_study_records and
-                    today in task_study_records[task_name]):
-                today_task_minutes = task_study_records[task_name][today]
+            # このタスクの昨日と今日の勉強時間（2日分を1回で引く）
+            (_, yesterday_seconds), (_, today_seconds) = \
+                query.daily(yesterday, today, tasks=[task_id])
 
-            today_hours, today_mins = divmod(today_task_minutes, 60)
+            today_hours, today_mins = divmod(today_seconds // 60, 60)
             self.today_study_label.setText(f"今日: {today_hours}時間{today_mins}分")
 
-            # このタスクの昨日の勉強時間
-            yesterday_task_minutes = 0
-            if (task_name in task_study_records and
-                    yesterday in task_study_records[task_name]):
-                yesterday_task_minutes = \
-                    task_study_records[task_name][yesterday]
-
             yesterday_hours, yesterday_mins = \
-                divmod(yesterday_task_minutes, 60)
+                divmod(yesterday_seconds // 60, 60)
             self.yesterday_study_label.setText(
                 f"昨日: {yesterday_hours}時間{yesterday_mins}分")
 
-        # 全タスクの総合計勉強時間
-        names_in_list = set()
-        for i in range(self.task_list.count()):
-            it = self.task_list.item(i)
-            if it:
-                names_in_list.add(it.text())
-
-        all_total_minutes = 0
-        for name, per_task in task_study_records.items():
-            if name in names_in_list:
-                for time in per_task.values():
-                    all_total_minutes += time
+        # 全タスクの総合計勉強時間（一覧にあるタスクの分だけ。タスク無しの記録や
+        # 消えたタスクの記録は数えない）
+        all_total_minutes = self.repository.query.total(
+            tasks=self.repository.task_ids()) // 60
         total_hours, total_mins = divmod(all_total_minutes, 60)
         self.all_sum_time.setText(f"全タスクの総合計: {total_hours}時間{total_mins}分")
 
@@ -621,23 +586,10 @@ class TasksWidget(QWidget):
         reply = msg_box.exec()
 
         if reply == QMessageBox.StandardButton.Yes:
-            # 今日の勉強時間を削除
-            study_records = self.settings.value("study_time", {})
+            # 今日のセッションを削除して集計からも引く
+            # 画面は study_time_changed で更新される
             today = datetime.date.today().isoformat()
-
-            if today in study_records:
-                del study_records[today]
-                self.settings.setValue("study_time", study_records)
-
-            # タスク別の今日の勉強時間もリセット
-            task_study_records = self.settings.value("task_study_time", {})
-            for task_name in task_study_records:
-                if today in task_study_records[task_name]:
-                    del task_study_records[task_name][today]
-            self.settings.setValue("task_study_time", task_study_records)
-
-            # 画面を更新
-            self.update_study_time_display()
+            self.repository.reset_day(today)
 
             # 完了メッセージ
             QMessageBox.information(
@@ -651,100 +603,14 @@ class TasksWidget(QWidget):
         # 現在のソート方式を取得
         sort_type = self.task_sort.currentText()
 
-        # 1. いったん全ての項目をリストから取り出して、Pythonのリストに入れる
-        items = []
-        while self.task_list.count() > 0:
-            item = self.task_list.takeItem(0)
-            if item is not None:
-                items.append(item)
-
-        if sort_type == "特になし":
-            # チェック状態のみでソート（デフォルト動作）
-            items.sort(key=lambda item: (
-                0 if item.checkState() == Qt.CheckState.Unchecked else 1
-            ))
-
-        elif sort_type == "グループ":
-            # 詳細欄にグループ情報がある場合はそれでソート
-            # 詳細の先頭に [グループ名] の形式で書いてあることを想定
-            def get_group_key(item):
-                detail = item.data(Qt.ItemDataRole.UserRole) or ""
-                # チェック状態を最優先、次にグループ名でソート
-                check_state = (
-                    0 if item.checkState() == Qt.CheckState.Unchecked else 1
-                )
-                group_name = ""
-
-                # 詳細の先頭から [グループ名] を抽出
-                if detail.strip().startswith('[') and ']' in detail:
-                    end_bracket = detail.find(']')
-                    group_name = detail[1:end_bracket].strip()
-
-                return (check_state, group_name, item.text())
-
-            items.sort(key=get_group_key)
-
-        elif sort_type == "緊急度順":
-            # 新しい緊急度システムに基づいてソート
-            def get_priority_key(item):
-                # チェック状態を最優先
-                check_state = (
-                    0 if item.checkState() == Qt.CheckState.Unchecked else 1
-                )
-
-                # 保存された緊急度データを取得
-                priority_data = (item.data(Qt.ItemDataRole.UserRole + 1) or
-                                 "normal")
-
-                # 緊急度の優先順位を設定（数値が小さいほど優先度が高い）
-                priority_order = {
-                    "urgent_important": 0,      # 🔥 緊急×重要
-                    "urgent_not_important": 1,  # ⚡ 緊急×非重要
-                    "not_urgent_important": 2,  # 💡 非緊急×重要
-                    "normal": 3,                # 📋 通常
-                    "not_urgent_not_important": 4  # 📝 非緊急×非重要
-                }
-
-                priority = priority_order.get(priority_data, 3)
-
-                return (check_state, priority, item.text())
-
-            items.sort(key=get_priority_key)
-
-        elif sort_type == "アイゼンハワーマトリックス":
-            # アイゼンハワーマトリックスに基づいて明確にソート
-            def get_eisenhower_key(item):
-                # チェック状態を最優先
-                check_state = (
-                    0 if item.checkState() == Qt.CheckState.Unchecked else 1
-                )
-
-                # 保存された緊急度データを取得
-                priority_data = (item.data(Qt.ItemDataRole.UserRole + 1) or
-                                 "normal")
-
-                # アイゼンハワーマトリックスの順序
-                # 1. Do First (緊急×重要)
-                # 2. Schedule (非緊急×重要)
-                # 3. Delegate (緊急×非重要)
-                # 4. Eliminate (非緊急×非重要)
-                eisenhower_order = {
-                    "urgent_important": 0,
-                    "urgent_not_important": 1,
-                    "not_urgent_important": 2,
-                    "normal": 3,
-                    "not_urgent_not_important": 4
-                }
-
-                priority = eisenhower_order.get(priority_data, 3)
-
-                return (check_state, priority, item.text())
-
-            items.sort(key=get_eisenhower_key)
-
-        # 3. 並び替えたリストをQListWidgetに戻す
-        for item in items:
-            self.task_list.addItem(item)
+        # 全体の並び替えは並び順を変えたときだけ。以後の追加・変更は
+        # プロキシが該当行だけを二分探索で入れ直す
+        self.task_proxy.set_sort_type(sort_type)
 
         # 並び順設定を保存
         self.settings.setValue("sort_type", sort_type)
+
+    def search_tasks(self, query):
+        """検索語を含むタスクだけを表示する（空なら全て表示）"""
+        # 当てはまるタスクは索引から引くので、タスクが多くても入力が重くならない
+        self.task_proxy.set_search(query)
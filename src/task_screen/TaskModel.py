@@ -0,0 +1,294 @@
+from PyQt6.QtCore import (Qt, QAbstractListModel, QModelIndex,
+                          QSortFilterProxyModel)
+
+
+# 緊急度の優先順位を設定（数値が小さいほど優先度が高い）
+PRIORITY_ORDER = {
+    "urgent_important": 0,      # 🔥 緊急×重要
+    "urgent_not_important": 1,  # ⚡ 緊急×非重要
+    "not_urgent_important": 2,  # 💡 非緊急×重要
+    "normal": 3,                # 📋 通常
+    "not_urgent_not_important": 4  # 📝 非緊急×非重要
+}
+
+# アイゼンハワーマトリックスの順序
+# 1. Do First (緊急×重要)
+# 2. Schedule (非緊急×重要)
+# 3. Delegate (緊急×非重要)
+# 4. Eliminate (非緊急×非重要)
+EISENHOWER_ORDER = {
+    "urgent_important": 0,
+    "urgent_not_important": 1,
+    "not_urgent_important": 2,
+    "normal": 3,
+    "not_urgent_not_important": 4
+}
+
+
+def task_sort_key(task, sort_type):
+    """
+    sort_type での並び順の比較キーを返す。
+    最後に id を付けて、同じキーのときは追加した順に並ぶようにする。
+    """
+    # チェック状態を最優先
+    check_state = 1 if task["checked"] else 0
+
+    if sort_type == "グループ":
+        # チェック状態を最優先、次にグループ名でソート
+        # （グループ名は詳細が変わったときにリポジトリが取り出し済み）
+        return (check_state, task["group"], task["text"], task["id"])
+
+    if sort_type == "緊急度順":
+        priority = PRIORITY_ORDER.get(task["urgency"], 3)
+        return (check_state, priority, task["text"], task["id"])
+
+    if sort_type == "アイゼンハワーマトリックス":
+        priority = EISENHOWER_ORDER.get(task["urgency"], 3)
+        return (check_state, priority, task["text"], task["id"])
+
+    # 特になし: チェック状態のみでソート（同じなら追加した順）
+    return (check_state, task["id"])
+
+
+class TaskListModel(QAbstractListModel):
+    """
+    リポジトリのタスクをそのまま並べるリストモデル。
+    リポジトリの差分通知を行の挿入・変更・削除として view に伝える。
+    """
+    DetailRole = Qt.ItemDataRole.UserRole
+    UrgencyRole = Qt.ItemDataRole.UserRole + 1
+    TaskIdRole = Qt.ItemDataRole.UserRole + 4
+    # 並び順の比較キー。これが変わった行だけプロキシが並べ直す
+    SortKeyRole = Qt.ItemDataRole.UserRole + 5
+    # 検索語に当てはまるか。これが変わった行だけプロキシが絞り込み直す
+    SearchRole = Qt.ItemDataRole.UserRole + 6
+
+    # タスクの列 -> 変更時に通知するロール
+    FIELD_ROLES = {
+        "text": [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole],
+        "checked": [Qt.ItemDataRole.CheckStateRole],
+        "detail": [DetailRole],
+        "urgency": [UrgencyRole],
+    }
+
+    # 並び順ごとに、比較キーに影響する列
+    SORT_FIELDS = {
+        "特になし": {"checked"},
+        "グループ": {"checked", "group", "text"},
+        "緊急度順": {"checked", "urgency", "text"},
+        "アイゼンハワーマトリックス": {"checked", "urgency", "text"},
+    }
+
+    def __init__(self, repository, parent=None):
+        super().__init__(parent)
+        self.repository = repository
+
+        # 行 -> task_id と、その逆引き
+        self._ids = []
+        self._rows = {}
+        self._reset_ids()
+
+        # task_id -> 現在の並び順での比較キー（変更されたタスクの分だけ作り直す）
+        self.sort_type = "特になし"
+        self._sort_keys = {}
+
+        # 検索語と、それに当てはまるタスクの id（検索していなければ None）
+        self.search_query = ""
+        self._matches = None
+
+        repository.task_added.connect(self._on_task_added)
+        repository.task_changed.connect(self._on_task_changed)
+        repository.task_removed.connect(self._on_task_removed)
+        repository.tasks_reordered.connect(self._on_tasks_reordered)
+
+    def _reset_ids(self):
+        self._ids = [task["id"] for task in self.repository.tasks()]
+        self._rows = {task_id: row for row, task_id in enumerate(self._ids)}
+
+    # -------------------------------------------------------------------------
+    # QAbstractListModel
+    # -------------------------------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._ids)
+
+    def task_at(self, row):
+        """row 行目のタスクの辞書を返す"""
+        return self.repository.get(self._ids[row])
+
+    def row_of(self, task_id):
+        """task_id の行番号を返す。無ければ -1"""
+        return self._rows.get(task_id, -1)
+
+    def set_sort_type(self, sort_type):
+        self.sort_type = sort_type
+        self._sort_keys = {}
+
+    def set_search(self, query):
+        """検索語を変える。空なら全タスクを表示する"""
+        self.search_query = query
+        if query.strip():
+            self._matches = self.repository.search(query)
+        else:
+            self._matches = None
+
+    def matches(self, row):
+        """row 行目のタスクが検索語に当てはまるか"""
+        return self._matches is None or self._ids[row] in self._matches
+
+    def _update_match(self, task_id):
+        if self._matches is None:
+            return
+        if self.repository.matches(task_id, self.search_query):
+            self._matches.add(task_id)
+        else:
+            self._matches.discard(task_id)
+
+    def sort_key(self, row):
+        """row 行目のタスクの比較キー（キャッシュ済みならそれを返す）"""
+        task_id = self._ids[row]
+        key = self._sort_keys.get(task_id)
+        if key is None:
+            key = task_sort_key(self.repository.get(task_id), self.sort_type)
+            self._sort_keys[task_id] = key
+        return key
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == self.TaskIdRole:
+            return self._ids[index.row()]
+        # 読み直した直後で、モデルが入れ替わる前のタスクはもう無いことがある
+        task = self.task_at(index.row())
+        if task is None:
+            return None
+
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return task["text"]
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return (Qt.CheckState.Checked if task["checked"] else
+                    Qt.CheckState.Unchecked)
+        if role == self.DetailRole:
+            return task["detail"]
+        if role == self.UrgencyRole:
+            return task["urgency"]
+        if role == self.SortKeyRole:
+            return self.sort_key(index.row())
+        if role == self.SearchRole:
+            return self.matches(index.row())
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        # ダブルクリックで名前編集＆チェックＯＫにする
+        return (Qt.ItemFlag.ItemIsSelectable
+                | Qt.ItemFlag.ItemIsEnabled
+                | Qt.ItemFlag.ItemIsEditable
+                | Qt.ItemFlag.ItemIsUserCheckable)
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        """view からの名前変更とチェック変更をリポジトリへ反映する"""
+        if not index.isValid():
+            return False
+        task_id = self._ids[index.row()]
+
+        if role == Qt.ItemDataRole.EditRole:
+            text = str(value).strip()
+            if not text:
+                return False
+            self.repository.update_task(task_id, text=text)
+            return True
+        if role == Qt.ItemDataRole.CheckStateRole:
+            checked = Qt.CheckState(value) == Qt.CheckState.Checked
+            self.repository.update_task(task_id, checked=checked)
+            return True
+        return False
+
+    # -------------------------------------------------------------------------
+    # リポジトリからの通知
+    # -------------------------------------------------------------------------
+
+    def _on_task_added(self, task_id):
+        self._update_match(task_id)
+        row = len(self._ids)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._ids.append(task_id)
+        self._rows[task_id] = row
+        self.endInsertRows()
+
+    def _on_task_changed(self, task_id, fields):
+        row = self._rows.get(task_id)
+        if row is None:
+            return
+        roles = []
+        for name in fields:
+            roles.extend(self.FIELD_ROLES.get(name, []))
+
+        # 比較キーが変わるときだけキーを作り直し、プロキシに並べ直してもらう
+        if self.SORT_FIELDS.get(self.sort_type, set()) & set(fields):
+            self._sort_keys.pop(task_id, None)
+            roles.append(self.SortKeyRole)
+
+        # 名前か詳細が変わったら、検索語に当てはまるかを確かめ直す
+        if self._matches is not None and {"text", "detail"} & set(fields):
+            self._update_match(task_id)
+            roles.append(self.SearchRole)
+
+        index = self.index(row)
+        self.dataChanged.emit(index, index, roles)
+
+    def _on_task_removed(self, task_id):
+        row = self._rows.get(task_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._ids[row]
+        del self._rows[task_id]
+        self._sort_keys.pop(task_id, None)
+        for later_row in range(row, len(self._ids)):
+            self._rows[self._ids[later_row]] = later_row
+        self.endRemoveRows()
+
+    def _on_tasks_reordered(self):
+        self.beginResetModel()
+        self._reset_ids()
+        self._sort_keys = {}
+        self.set_search(self.search_query)
+        self.endResetModel()
+
+
+class TaskSortProxy(QSortFilterProxyModel):
+    """
+    タスク一覧の並び替え用のプロキシ。
+    並び順は 特になし / グループ / 緊急度順 / アイゼンハワーマトリックス から選ぶ。
+    検索語があれば、それに当てはまるタスクだけに絞り込む。
+
+    dynamicSortFilter により、追加や変更があった行だけを二分探索で
+    正しい位置へ入れ直す。全体の並び替えは並び順を変えたときだけ行う。
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setDynamicSortFilter(True)
+        self.setSortRole(TaskListModel.SortKeyRole)
+        self.setFilterRole(TaskListModel.SearchRole)
+
+    def set_sort_type(self, sort_type):
+        """並び順を変えて全体を並び替え直す"""
+        self.sourceModel().set_sort_type(sort_type)
+        self.invalidate()
+        self.sort(0)
+
+    def set_search(self, query):
+        """検索語で絞り込む（当てはまるタスクは索引から引く）"""
+        self.sourceModel().set_search(query)
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self.sourceModel().matches(source_row)
+
+    def lessThan(self, left, right):
+        model = self.sourceModel()
+        return model.sort_key(left.row()) < model.sort_key(right.row())
@@ -0,0 +1,151 @@
+"""
+画面を開かずにタスクの追加や勉強時間の記録をするコマンド。
+
+    python taskmanager.py add "英単語を覚える" --urgency urgent_important
+    python taskmanager.py list                (未完了のタスク。--all で全部)
+    python taskmanager.py check 12            (--undo で未完了に戻す)
+    python taskmanager.py log 25 --task 12    (25分勉強した。タスク名でもよい)
+    python taskmanager.py stats               (今日・直近7日・連続日数など)
+
+Qt を読み込まずにアプリと同じデータベースを直接読み書きするので、
+シェルや git のフックから呼んでもすぐ終わる。アプリを起動中でも使え、
+アプリはウィンドウに戻ってきたときに変更を読み直す。
+"""
+import argparse
+import datetime
+import sys
+
+from storage import StudyIndex, StudyMetrics, StudyQuery, TaskStore
+from utils import format_seconds
+
+
+# タスクの緊急度（task_screen の選択肢と同じ）
+URGENCIES = ("normal", "urgent_important", "urgent_not_important",
+             "not_urgent_important", "not_urgent_not_important")
+
+
+def _find_task(store, key):
+    """id かタスク名からタスクの id を返す（見つからなければ None）"""
+    if key.isdigit() and store.get_task(int(key)) is not None:
+        return int(key)
+    return store.find_task_id(key)
+
+
+def add(store, args):
+    task_id = store.add_task(args.text, args.urgency, args.detail)
+    print(task_id)
+    return 0
+
+
+def list_tasks(store, args):
+    if args.group is None:
+        tasks = store.load_tasks()
+    else:
+        # グループの索引で、そのグループのタスクだけを読む
+        tasks = (store.get_task(task_id)
+                 for task_id in store.group_task_ids(args.group))
+    # タブ区切り: id, 完了なら x, 緊急度, タスク名
+    for task in tasks:
+        if task["checked"] and not args.all:
+            continue
+        print(f"{task['id']}\t{'x' if task['checked'] else ' '}\t"
+              f"{task['urgency']}\t{task['text']}")
+    return 0
+
+
+def check(store, args):
+    task_id = _find_task(store, args.task)
+    if task_id is None:
+        print(f"タスクが見つかりません: {args.task}", file=sys.stderr)
+        return 1
+    store.update_task(task_id, checked=not args.undo)
+    return 0
+
+
+def log(store, args):
+    task_id = None
+    if args.task is not None:
+        task_id = _find_task(store, args.task)
+        if task_id is None:
+            print(f"タスクが見つかりません: {args.task}", file=sys.stderr)
+            return 1
+    if args.minutes <= 0:
+        print("分は 1 以上を指定してください", file=sys.stderr)
+        return 1
+    store.record_session(task_id, args.minutes * 60)
+    return 0
+
+
+def stats(store, args):
+    index = StudyIndex.build(store.session_totals())
+    query = StudyQuery(index)
+    tasks = None
+    if args.task is not None:
+        task_id = _find_task(store, args.task)
+        if task_id is None:
+            print(f"タスクが見つかりません: {args.task}", file=sys.stderr)
+            return 1
+        tasks = [task_id]
+
+    today = datetime.date.today()
+    first = today - datetime.timedelta(days=max(args.days, 1) - 1)
+    print(f"今日\t{format_seconds(query.total(today, today, tasks))}")
+    print(f"合計\t{format_seconds(query.total(tasks=tasks))}")
+    if tasks is None:
+        # 連続日数などはタスクに関係なく1日ごとの合計で数える
+        metrics = StudyMetrics.recompute(index.day_totals(), today)
+        print(f"連続日数\t{metrics['streak']}日 "
+              f"(最長 {metrics['best_streak']}日)")
+        print(f"1日平均\t7日 {format_seconds(metrics['average_7'])} / "
+              f"30日 {format_seconds(metrics['average_30'])}")
+        if metrics["best_day"] is not None:
+            print(f"最高\t{metrics['best_day']} "
+                  f"{format_seconds(metrics['best_day_seconds'])}")
+    for day, seconds in query.daily(first, today, tasks):
+        print(f"{day}\t{format_seconds(seconds)}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="画面を開かずにタスクと勉強時間を扱う")
+    parser.add_argument("--db", help="データベースのパス（省略時はアプリと同じ）")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("add", help="タスクを追加して id を表示する")
+    p.add_argument("text")
+    p.add_argument("--urgency", choices=URGENCIES, default="normal")
+    p.add_argument("--detail", default="",
+                   help="詳細（先頭に [グループ名] と書くとグループになる）")
+    p.set_defaults(func=add)
+
+    p = sub.add_parser("list", help="タスクをタブ区切りで表示する")
+    p.add_argument("--all", action="store_true", help="完了したタスクも表示する")
+    p.add_argument("--group", help="このグループのタスクだけ表示する")
+    p.set_defaults(func=list_tasks)
+
+    p = sub.add_parser("check", help="タスクを完了にする")
+    p.add_argument("task", help="タスクの id か名前")
+    p.add_argument("--undo", action="store_true", help="未完了に戻す")
+    p.set_defaults(func=check)
+
+    p = sub.add_parser("log", help="勉強した時間を記録する")
+    p.add_argument("minutes", type=int, help="勉強した分")
+    p.add_argument("--task", help="タスクの id か名前（省略時はタスク無し）")
+    p.set_defaults(func=log)
+
+    p = sub.add_parser("stats", help="勉強時間の集計を表示する")
+    p.add_argument("--days", type=int, default=7, help="日別に表示する日数")
+    p.add_argument("--task", help="このタスクだけ集計する")
+    p.set_defaults(func=stats)
+
+    args = parser.parse_args(argv)
+    store = TaskStore(args.db)
+    try:
+        return args.func(store, args)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+タスクと勉強時間の記録を CSV / JSON Lines で書き出し・取り込みするコマンド。
+
+    python taskmanager_data.py export tasks tasks.csv
+    python taskmanager_data.py export sessions sessions.jsonl
+    python taskmanager_data.py export daily -            (標準出力へ)
+    python taskmanager_data.py import tasks tasks.csv
+    python taskmanager_data.py import sessions sessions.jsonl
+
+種類は tasks（タスク）・sessions（1回ごとの作業記録）・daily（日別・タスク別の合計）。
+形式はファイルの拡張子 (.csv / .jsonl) で決まり、--format で指定もできる。
+1行ずつ読み書きし、取り込みは --batch-size 件ごとにコミットするので、
+何十万件あってもメモリに全件を載せることはない。
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from storage import TaskStore
+from storage.transfer import BATCH_SIZE, FIELDS, export_rows, import_rows
+
+
+def _format_of(path, requested):
+    if requested:
+        return requested
+    if path.endswith(".csv"):
+        return "csv"
+    # 標準入出力や拡張子の無いファイルは JSON Lines として扱う
+    return "jsonl"
+
+
+def _open(path, mode):
+    if path == "-":
+        stream = sys.stdout if mode == "w" else sys.stdin
+        stream.reconfigure(encoding="utf-8", newline="")
+        return stream
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def export_data(store, kind, path, fmt):
+    fields = FIELDS[kind]
+    count = 0
+    stream = _open(path, "w")
+    try:
+        if fmt == "csv":
+            writer = csv.writer(stream)
+            writer.writerow(fields)
+            for row in export_rows(store, kind):
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in export_rows(store, kind):
+                stream.write(json.dumps(dict(zip(fields, row)),
+                                        ensure_ascii=False) + "\n")
+                count += 1
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+        else:
+            stream.flush()
+    return count
+
+
+def _read_records(stream, fmt):
+    """1件ずつ 列名 -> 値 の辞書を返す"""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def import_data(store, kind, path, fmt, batch_size):
+    stream = _open(path, "r")
+    try:
+        return import_rows(store, kind, _read_records(stream, fmt),
+                           batch_size)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="タスクと勉強時間の記録を書き出し・取り込みする")
+    parser.add_argument("--db", help="データベースのパス（省略時はアプリと同じ）")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for command in ("export", "import"):
+        p = sub.add_parser(command)
+        p.add_argument("kind", choices=sorted(FIELDS))
+        p.add_argument("path", help="ファイルのパス（- で標準入出力）")
+        p.add_argument("--format", choices=("csv", "jsonl"))
+        if command == "import":
+            p.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    store = TaskStore(args.db)
+    fmt = _format_of(args.path, args.format)
+    try:
+        if args.command == "export":
+            try:
+                count = export_data(store, args.kind, args.path, fmt)
+            except BrokenPipeError:
+                # head などで読み手が先に閉じた。残りは捨てて静かに終わる
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                return 1
+            print(f"{count} 件を書き出しました", file=sys.stderr)
+        else:
+            count = import_data(store, args.kind, args.path, fmt,
+                                args.batch_size)
+            print(f"{count} 件を取り込みました", file=sys.stderr)
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
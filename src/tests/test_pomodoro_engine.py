@@ -0,0 +1,257 @@
+"""
+PomodoroEngine を VirtualClock で動かして確かめる。
+
+    cd src && python -m unittest tests.test_pomodoro_engine
+"""
+import unittest
+
+from pomodoro_core import (PomodoroEngine, PhaseJournal, VirtualClock,
+                           WORK, BREAK, COMPLETED, SKIPPED, STOPPED)
+from storage import TaskStore
+
+
+# 2023-11-14 22:13:20 (UTC)。どの日付でもよい
+EPOCH = 1_700_000_000
+
+
+def make_engine(clock=None, **options):
+    """エンジンと、受け取ったイベントの一覧を返す"""
+    engine = PomodoroEngine(clock=clock or VirtualClock(EPOCH), **options)
+    events = []
+    engine.add_listener(lambda event, data: events.append((event, data)))
+    return engine, events
+
+
+def finished(events):
+    return [data for event, data in events if event == "phase_finished"]
+
+
+class CompleteTest(unittest.TestCase):
+    def test_work_phase_completes_on_time(self):
+        engine, events = make_engine()
+        engine.start()
+        engine.clock.advance(25 * 60 - 1)
+        self.assertFalse(engine.update())
+        engine.clock.advance(1)
+        self.assertTrue(engine.update())
+
+        [data] = finished(events)
+        self.assertEqual(data["phase"], WORK)
+        self.assertEqual(data["reason"], COMPLETED)
+        self.assertEqual(data["seconds"], 25 * 60)
+        self.assertEqual(data["start"], EPOCH)
+        self.assertEqual(data["end"], EPOCH + 25 * 60)
+        self.assertEqual(engine.phase, BREAK)
+        self.assertEqual(engine.sets_completed, 1)
+        # 自動開始しなければ休憩は始まらない
+        self.assertFalse(engine.in_progress())
+
+    def test_pause_does_not_count(self):
+        engine, events = make_engine()
+        engine.start()
+        engine.clock.advance(600)
+        engine.pause()
+        engine.clock.advance(3600)
+        self.assertFalse(engine.update())
+        engine.start()
+        engine.clock.advance(25 * 60 - 600)
+        engine.update()
+        [data] = finished(events)
+        self.assertEqual(data["seconds"], 25 * 60)
+
+    def test_auto_break_starts_from_the_deadline(self):
+        engine, events = make_engine(auto_break=True)
+        engine.start()
+        # 表示の更新が少し遅れても、休憩は作業の終了時刻から数える
+        engine.clock.advance(25 * 60 + 1)
+        engine.update()
+        self.assertEqual(engine.phase, BREAK)
+        self.assertTrue(engine.is_running())
+        self.assertEqual(engine.remaining(), 5 * 60 - 1)
+
+    def test_late_wake_up_still_chains(self):
+        # 画面が隠れている間のタイマーは数秒遅れて起きることがある
+        engine, events = make_engine(auto_break=True)
+        engine.start()
+        engine.clock.advance(25 * 60 + 5)
+        engine.update()
+        self.assertTrue(engine.is_running())
+        self.assertEqual(engine.remaining(), 5 * 60 - 5)
+
+    def test_long_overdue_does_not_chain(self):
+        engine, events = make_engine(auto_break=True)
+        engine.start()
+        engine.clock.advance(25 * 60 + 600)
+        engine.update()
+        self.assertEqual(len(finished(events)), 1)
+        self.assertEqual(engine.phase, BREAK)
+        self.assertFalse(engine.in_progress())
+
+    def test_a_day_of_auto_pomodoros(self):
+        engine, events = make_engine(auto_next=True, auto_break=True)
+        engine.start()
+        for _ in range(24 * 60):
+            engine.clock.advance(60)
+            engine.update()
+        work = [data for data in finished(events) if data["phase"] == WORK]
+        self.assertEqual(len(work), 24 * 60 // 30)
+        self.assertEqual(engine.sets_completed, len(work))
+
+
+class SkipTest(unittest.TestCase):
+    def test_skip_running_phase(self):
+        engine, events = make_engine()
+        engine.start()
+        engine.clock.advance(600)
+        engine.skip()
+        [data] = finished(events)
+        self.assertEqual(data["reason"], SKIPPED)
+        self.assertEqual(data["seconds"], 600)
+        self.assertEqual(engine.phase, BREAK)
+        self.assertFalse(engine.in_progress())
+
+    def test_skip_paused_phase(self):
+        engine, events = make_engine()
+        engine.start()
+        engine.clock.advance(300)
+        engine.pause()
+        engine.clock.advance(1000)
+        engine.skip()
+        [data] = finished(events)
+        self.assertEqual(data["reason"], SKIPPED)
+        self.assertEqual(data["seconds"], 300)
+        self.assertEqual(data["end"], EPOCH + 1300)
+        self.assertEqual(engine.phase, BREAK)
+        self.assertFalse(engine.in_progress())
+
+    def test_skip_before_start_does_nothing(self):
+        engine, events = make_engine()
+        engine.skip()
+        self.assertEqual(finished(events), [])
+        self.assertEqual(engine.phase, WORK)
+
+    def test_skip_paused_phase_clears_journal(self):
+        store = TaskStore(":memory:")
+        engine, events = make_engine()
+        PhaseJournal(engine, store)
+        engine.start()
+        engine.clock.advance(300)
+        engine.pause()
+        self.assertIsNotNone(store.load_running_phase())
+        engine.skip()
+        self.assertIsNone(store.load_running_phase())
+        store.close()
+
+
+class ResetTest(unittest.TestCase):
+    def test_reset_reports_progress_and_returns_to_work(self):
+        engine, events = make_engine(sets_completed=3)
+        engine.start()
+        engine.clock.advance(25 * 60)
+        engine.update()
+        engine.start()
+        engine.clock.advance(100)
+        engine.reset()
+        data = finished(events)[-1]
+        self.assertEqual(data["phase"], BREAK)
+        self.assertEqual(data["reason"], STOPPED)
+        self.assertEqual(data["seconds"], 100)
+        self.assertEqual(engine.phase, WORK)
+        self.assertEqual(engine.sets_completed, 0)
+        self.assertFalse(engine.in_progress())
+
+    def test_reset_when_idle_reports_nothing(self):
+        engine, events = make_engine()
+        engine.reset()
+        self.assertEqual(finished(events), [])
+        self.assertEqual(events[-1][0], "reset")
+
+
+class RestoreTest(unittest.TestCase):
+    def snapshot_after(self, seconds, paused=False):
+        engine, _ = make_engine(auto_next=True, auto_break=True)
+        engine.start()
+        engine.clock.advance(seconds)
+        if paused:
+            engine.pause()
+        return engine.snapshot()
+
+    def restore(self, snapshot, downtime):
+        """downtime 秒後に起動し直したエンジンで snapshot を復元する"""
+        clock = VirtualClock(EPOCH + 60 + downtime)
+        engine, events = make_engine(clock, auto_next=True, auto_break=True)
+        engine.restore(snapshot)
+        return engine, events
+
+    def test_restore_continues_before_deadline(self):
+        engine, events = self.restore(self.snapshot_after(60), 120)
+        self.assertEqual(finished(events), [])
+        self.assertTrue(engine.is_running())
+        self.assertEqual(engine.remaining(), 25 * 60 - 180)
+
+    def test_restore_paused_phase_stays_paused(self):
+        snapshot = self.snapshot_after(60, paused=True)
+        engine, events = self.restore(snapshot, 3 * 86400)
+        self.assertEqual(finished(events), [])
+        self.assertFalse(engine.is_running())
+        self.assertEqual(engine.remaining(), 25 * 60 - 60)
+
+    def test_restore_after_downtime_finishes_only_the_journaled_phase(self):
+        snapshot = self.snapshot_after(60)
+        engine, events = self.restore(snapshot, 3 * 86400)
+        [data] = finished(events)
+        self.assertEqual(data["phase"], WORK)
+        self.assertEqual(data["reason"], COMPLETED)
+        self.assertEqual(data["seconds"], 25 * 60)
+        self.assertEqual(data["end"], snapshot["deadline"])
+        # 止まっている間に自動で続くはずだった休憩や作業は始めない
+        self.assertEqual(engine.phase, BREAK)
+        self.assertFalse(engine.in_progress())
+        self.assertEqual(engine.sets_completed, 1)
+
+    def test_resume_journal_after_downtime(self):
+        store = TaskStore(":memory:")
+        store.save_running_phase(self.snapshot_after(60))
+        clock = VirtualClock(EPOCH + 3 * 86400)
+        engine, events = make_engine(clock, auto_next=True, auto_break=True)
+        self.assertTrue(PhaseJournal(engine, store).resume())
+        self.assertEqual(len(finished(events)), 1)
+        self.assertIsNone(store.load_running_phase())
+        store.close()
+
+
+class SleepTest(unittest.TestCase):
+    def test_sleep_counts_toward_the_phase(self):
+        engine, events = make_engine()
+        engine.start()
+        engine.clock.advance(60)
+        engine.update()
+        # monotonic が止まっていても、スリープしていた分は進んでいる
+        engine.clock.sleep(600)
+        engine.clock.advance(1)
+        engine.update()
+        self.assertEqual(engine.remaining(), 25 * 60 - 661)
+
+    def test_small_drift_is_ignored(self):
+        engine, events = make_engine()
+        engine.start()
+        engine.clock.sleep(1)
+        engine.clock.advance(1)
+        engine.update()
+        self.assertEqual(engine.remaining(), 25 * 60 - 1)
+
+    def test_sleep_past_deadline_does_not_chain(self):
+        engine, events = make_engine(auto_next=True, auto_break=True)
+        engine.start()
+        engine.clock.sleep(86400)
+        engine.clock.advance(1)
+        engine.update()
+        [data] = finished(events)
+        self.assertEqual(data["reason"], COMPLETED)
+        self.assertEqual(data["end"], EPOCH + 25 * 60)
+        self.assertEqual(engine.phase, BREAK)
+        self.assertFalse(engine.in_progress())
+
+
+if __name__ == "__main__":
+    unittest.main()
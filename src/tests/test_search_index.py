@@ -0,0 +1,86 @@
+"""
+SearchIndex の検索結果を、全タスクを部分一致で確かめた結果と比べる。
+後回しにして作った索引は、入れている途中のどの時点でも同じ結果になること。
+
+    cd src && python -m unittest tests.test_search_index
+"""
+import random
+import unittest
+
+from storage import SearchIndex
+from storage.SearchIndex import normalize
+
+
+WORDS = ["英単語", "数学", "ｐｙｔｈｏｎ", "Python", "問題集", "復習",
+         "レポート", "ab", "abc", "[数学]", "3章", "ＡＢＣ"]
+QUERIES = ["英単語", "python", "ABC", "数", "学 問題", "ab c", "3", "レポ",
+           "存在しない", "", "[数"]
+
+
+def random_tasks(seed, count=300):
+    rng = random.Random(seed)
+    return {task_id: {"id": task_id,
+                      "text": " ".join(rng.sample(WORDS, 2)),
+                      "detail": "".join(rng.sample(WORDS, rng.randrange(3)))}
+            for task_id in range(1, count + 1)}
+
+
+def brute_search(tasks, query):
+    terms = SearchIndex.terms(query)
+    return {task_id for task_id, task in tasks.items()
+            if all(term in normalize(f"{task['text']}\n{task['detail']}")
+                   for term in terms)}
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tasks = random_tasks(seed=1)
+
+    def assert_same_as_brute_force(self, index):
+        for query in QUERIES:
+            with self.subTest(query=query):
+                expected = brute_search(self.tasks, query)
+                self.assertEqual(index.search(query), expected)
+                for task_id in (1, 150, 300):
+                    self.assertEqual(index.matches(task_id, query),
+                                     task_id in expected)
+
+    def test_build(self):
+        self.assert_same_as_brute_force(
+            SearchIndex.build(self.tasks.values()))
+
+    def test_deferred_before_indexing(self):
+        index = SearchIndex.deferred(self.tasks)
+        self.assertTrue(index.has_pending())
+        self.assert_same_as_brute_force(index)
+
+    def test_deferred_while_indexing(self):
+        index = SearchIndex.deferred(self.tasks)
+        # 一部だけ正規化した状態、一部だけ索引に入れた状態でも同じ結果
+        index._normalize_raw(100)
+        self.assert_same_as_brute_force(index)
+        while index.has_pending():
+            index.index_pending(budget=0)
+            self.assert_same_as_brute_force(index)
+
+    def test_update_and_remove_while_pending(self):
+        index = SearchIndex.deferred(self.tasks)
+        index._normalize_raw(100)
+        self.tasks[5] = dict(self.tasks[5], text="新しい名前")
+        index.update(5, self.tasks[5]["text"], self.tasks[5]["detail"])
+        self.tasks[200] = dict(self.tasks[200], detail="英単語")
+        index.update(200, self.tasks[200]["text"], self.tasks[200]["detail"])
+        del self.tasks[7]
+        index.remove(7)
+        self.tasks[301] = {"id": 301, "text": "追加", "detail": ""}
+        index.update(301, "追加", "")
+        self.assert_same_as_brute_force(index)
+        self.assertEqual(index.search("新しい"), {5})
+        while index.has_pending():
+            index.index_pending()
+        self.assert_same_as_brute_force(index)
+        self.assertEqual(index.search("追加"), {301})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+StudyIndex / StudyQuery の集計を、セッションを1件ずつ足した結果と比べる。
+
+    cd src && python -m unittest tests.test_study_query
+"""
+import datetime
+import random
+import unittest
+
+from storage import StudyIndex, StudyQuery
+
+
+FIRST_DAY = datetime.date(2024, 1, 1)
+TASKS = [None, 1, 2, 3, 4, 5]
+
+
+def random_sessions(seed, count=500, days=60):
+    """(task_id, 日付, 秒) の記録をでたらめに作る"""
+    rng = random.Random(seed)
+    return [(rng.choice(TASKS),
+             (FIRST_DAY + datetime.timedelta(days=rng.randrange(days)))
+             .isoformat(),
+             rng.randrange(60, 3600))
+            for _ in range(count)]
+
+
+def brute_total(sessions, start=None, end=None, tasks=None):
+    return sum(seconds for task_id, day, seconds in sessions
+               if (start is None or day >= start)
+               and (end is None or day <= end)
+               and (tasks is None or task_id in tasks))
+
+
+class StudyQueryTest(unittest.TestCase):
+    def setUp(self):
+        self.sessions = random_sessions(seed=1)
+        self.query = StudyQuery(StudyIndex.build(self.sessions))
+
+    def test_total_matches_brute_force(self):
+        rng = random.Random(2)
+        ranges = [(None, None), ("2024-01-10", None), (None, "2024-01-20"),
+                  ("2024-01-15", "2024-01-15"), ("2024-03-01", "2024-04-01")]
+        task_sets = [None, [1], [None], [None, 2, 3], [], [99]]
+        for start, end in ranges:
+            for tasks in task_sets:
+                with self.subTest(start=start, end=end, tasks=tasks):
+                    self.assertEqual(
+                        self.query.total(start, end, tasks),
+                        brute_total(self.sessions, start, end, tasks))
+        for _ in range(50):
+            first, last = sorted(rng.randrange(70) for _ in range(2))
+            start = (FIRST_DAY + datetime.timedelta(days=first)).isoformat()
+            end = (FIRST_DAY + datetime.timedelta(days=last)).isoformat()
+            tasks = rng.sample(TASKS, rng.randrange(1, len(TASKS)))
+            self.assertEqual(self.query.total(start, end, tasks),
+                             brute_total(self.sessions, start, end, tasks))
+
+    def test_daily_matches_brute_force(self):
+        start = datetime.date(2024, 1, 5)
+        end = datetime.date(2024, 1, 25)
+        series = self.query.daily(start, end, tasks=[1, None])
+        self.assertEqual(len(series), 21)
+        for day, seconds in series:
+            self.assertEqual(seconds,
+                             brute_total(self.sessions, day, day, {1, None}))
+
+    def test_by_task_matches_brute_force(self):
+        totals = self.query.by_task("2024-01-10", "2024-02-10")
+        for task_id in TASKS:
+            self.assertEqual(
+                totals.get(task_id, 0),
+                brute_total(self.sessions, "2024-01-10", "2024-02-10",
+                            [task_id]))
+
+    def test_index_updates_match_rebuild(self):
+        index = StudyIndex.build(self.sessions[:250])
+        for session in self.sessions[250:]:
+            index.add(*session)
+        index.remove_task(2)
+        index.reset_day("2024-01-15")
+        kept = [(task_id, day, seconds)
+                for task_id, day, seconds in self.sessions
+                if task_id != 2 and day != "2024-01-15"]
+        query = StudyQuery(index)
+        self.assertEqual(query.total(), brute_total(kept))
+        self.assertEqual(index.total(),
+                         brute_total(kept, tasks=[1, 3, 4, 5]))
+        for task_id in TASKS:
+            self.assertEqual(query.total(tasks=[task_id]),
+                             brute_total(kept, tasks=[task_id]))
+        self.assertEqual(sorted(index.day_totals()),
+                         sorted((day, brute_total(kept, day, day))
+                                for day in {day for _, day, _ in kept}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+"""
+TaskStore の表の作り方と、タスクの置き換えを確かめる。
+
+    cd src && python -m unittest tests.test_task_store
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from storage import TaskStore, import_legacy_settings
+from storage.TaskStore import SCHEMA_VERSION
+
+
+def schema(conn):
+    """表ごとの列と、索引の名前"""
+    tables = {}
+    indexes = set()
+    for kind, name in conn.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE name NOT LIKE 'sqlite_%'"):
+        if kind == "index":
+            indexes.add(name)
+        else:
+            tables[name] = [tuple(row)[1:] for row in
+                            conn.execute(f"PRAGMA table_info({name})")]
+    return tables, indexes
+
+
+class LegacySettings:
+    """QSettings("CHU1PC", "TaskManagerApp") の代わりに値を返すだけのもの"""
+    def __init__(self, values):
+        self.values = values
+
+    def value(self, key, default=None):
+        return self.values.get(key, default)
+
+
+class MigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "tasks.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def legacy_db(self, version=0):
+        """版を持っていない頃の形（分単位のセッションログ、grp 列無し）"""
+        conn = sqlite3.connect(self.path)
+        conn.executescript("""
+            CREATE TABLE tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                position INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                detail TEXT NOT NULL DEFAULT '',
+                checked INTEGER NOT NULL DEFAULT 0,
+                urgency TEXT NOT NULL DEFAULT 'normal'
+            );
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE sessions (
+                id INTEGER PRIMARY KEY,
+                task_id INTEGER,
+                day TEXT NOT NULL,
+                start INTEGER,
+                end INTEGER,
+                minutes INTEGER NOT NULL
+            );
+            CREATE TABLE running_phase (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                phase TEXT NOT NULL,
+                running INTEGER NOT NULL,
+                started_at REAL,
+                deadline REAL,
+                remaining REAL NOT NULL,
+                task_id INTEGER
+            );
+            INSERT INTO tasks (id, position, text, detail)
+                VALUES (1, 0, '問題集', '[数学] 3章まで');
+            INSERT INTO tasks (id, position, text) VALUES (2, 1, '英単語');
+            INSERT INTO sessions (task_id, day, start, end, minutes)
+                VALUES (1, '2024-01-01', 1000, 2500, 25);
+            INSERT INTO sessions (task_id, day, start, end, minutes)
+                VALUES (NULL, '2024-01-02', NULL, 9000, 10);
+            INSERT INTO running_phase VALUES (0, 'work', 1, 1.0, 2.0, 60, 1);
+        """)
+        conn.execute(f"PRAGMA user_version = {version}")
+        conn.commit()
+        conn.close()
+
+    def test_fresh_db_matches_migrated_db(self):
+        fresh = TaskStore(":memory:")
+        self.legacy_db()
+        migrated = TaskStore(self.path)
+        self.assertEqual(schema(fresh.conn), schema(migrated.conn))
+        for store in (fresh, migrated):
+            self.assertEqual(
+                store.conn.execute("PRAGMA user_version").fetchone()[0],
+                SCHEMA_VERSION)
+            store.close()
+
+    def test_legacy_db_is_migrated_step_by_step(self):
+        self.legacy_db()
+        store = TaskStore(self.path)
+        self.assertEqual(store.get_task(1)["group"], "数学")
+        self.assertEqual(store.get_task(2)["group"], "")
+        rows = store.conn.execute(
+            "SELECT task_id, day, start, seconds FROM sessions "
+            "ORDER BY id").fetchall()
+        self.assertEqual([tuple(row) for row in rows],
+                         [(1, "2024-01-01", 1000, 1500),
+                          (None, "2024-01-02", 9000 - 600, 600)])
+        # 長さの分からない途中のフェーズは引き継がない
+        self.assertIsNone(store.load_running_phase())
+        store.close()
+
+    def test_only_missing_steps_run(self):
+        # 版 4 まで済んでいるなら、grp 列はもうあるものとして触らない
+        self.legacy_db(version=4)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "ALTER TABLE tasks ADD COLUMN grp TEXT NOT NULL DEFAULT ''")
+        conn.commit()
+        conn.close()
+        store = TaskStore(self.path)
+        self.assertEqual(store.get_task(1)["group"], "")
+        totals = {task_id: seconds for task_id, _, seconds
+                  in store.session_totals()}
+        self.assertEqual(totals, {1: 1500, None: 600})
+        store.close()
+
+    def test_reopening_does_not_migrate_again(self):
+        store = TaskStore(self.path)
+        store.add_task("英単語")
+        store.close()
+        store = TaskStore(self.path)
+        self.assertEqual([task["text"] for task in store.load_tasks()],
+                         ["英単語"])
+        store.close()
+
+    def test_newer_db_is_refused(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+        conn.close()
+        with self.assertRaises(RuntimeError):
+            TaskStore(self.path)
+
+
+class ReplaceTasksTest(unittest.TestCase):
+    def setUp(self):
+        self.store = TaskStore(":memory:")
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_same_name_keeps_id_and_sessions(self):
+        kept = self.store.add_task("英単語")
+        dropped = self.store.add_task("古いタスク")
+        self.store.record_session(kept, 600, end=1_700_000_000)
+        self.store.record_session(dropped, 300, end=1_700_000_000)
+
+        ids = self.store.replace_tasks([
+            {"text": "新しいタスク", "detail": "[数学] 問題集"},
+            {"text": "英単語", "checked": True},
+        ])
+
+        self.assertEqual(ids[1], kept)
+        self.assertNotIn(dropped, ids)
+        self.assertEqual([task["text"] for task in self.store.load_tasks()],
+                         ["新しいタスク", "英単語"])
+        self.assertEqual(self.store.get_task(ids[0])["group"], "数学")
+        self.assertTrue(self.store.get_task(kept)["checked"])
+        # 消えたタスクの記録はタスク無しとして残る
+        totals = {task_id: seconds for task_id, _, seconds
+                  in self.store.session_totals()}
+        self.assertEqual(totals, {kept: 600, None: 300})
+
+    def test_duplicate_names_reuse_ids_in_order(self):
+        first = self.store.add_task("復習")
+        second = self.store.add_task("復習")
+        ids = self.store.replace_tasks([{"text": "復習"}, {"text": "復習"},
+                                        {"text": "復習"}])
+        self.assertEqual(ids[:2], [first, second])
+        self.assertEqual(len(set(ids)), 3)
+
+    def test_restore_before_legacy_import_does_not_duplicate(self):
+        # restore.py を初回起動より前に実行しても、QSettings の古いタスクを
+        # もう一度取り込まない
+        settings = LegacySettings({"tasks": [
+            {"text": "英単語", "detail": "", "checked": False,
+             "urgency": "normal"},
+            {"text": "数学", "detail": "", "checked": False,
+             "urgency": "normal"},
+        ]})
+        self.store.replace_tasks([{"text": "英単語"}, {"text": "数学"}])
+        import_legacy_settings(self.store, settings)
+        self.assertEqual([task["text"] for task in self.store.load_tasks()],
+                         ["英単語", "数学"])
+
+
+if __name__ == "__main__":
+    unittest.main()
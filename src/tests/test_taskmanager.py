@@ -0,0 +1,95 @@
+"""
+画面を開かないコマンド taskmanager.py を確かめる。
+
+    cd src && python -m unittest tests.test_taskmanager
+"""
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import taskmanager
+from storage import TaskStore
+
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TaskManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmp.name, "tasks.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_command(self, *args):
+        """(終了コード, 標準出力, 標準エラー) を返す"""
+        out = io.StringIO()
+        err = io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            code = taskmanager.main(["--db", self.db, *args])
+        return code, out.getvalue(), err.getvalue()
+
+    def listed(self, *args):
+        _, out, _ = self.run_command("list", *args)
+        return [line.split("\t") for line in out.splitlines()]
+
+    def test_add_check_and_list(self):
+        code, out, err = self.run_command("add", "英単語",
+                                          "--urgency", "urgent_important")
+        self.assertEqual((code, err), (0, ""))
+        task_id = out.strip()
+        self.run_command("add", "問題集", "--detail", "[数学] 3章")
+
+        self.assertEqual(self.run_command("check", "問題集")[0], 0)
+        self.assertEqual(self.listed(),
+                         [[task_id, " ", "urgent_important", "英単語"]])
+        self.assertEqual([row[3] for row in self.listed("--all")],
+                         ["英単語", "問題集"])
+        self.assertEqual([row[3] for row in self.listed("--all", "--group",
+                                                        "数学")],
+                         ["問題集"])
+
+        self.run_command("check", "問題集", "--undo")
+        self.assertEqual(len(self.listed()), 2)
+
+    def test_unknown_task(self):
+        code, _, err = self.run_command("check", "無いタスク")
+        self.assertEqual(code, 1)
+        self.assertIn("無いタスク", err)
+
+    def test_log_and_stats(self):
+        self.run_command("add", "英単語")
+        self.assertEqual(self.run_command("log", "25", "--task", "英単語")[0],
+                         0)
+        self.run_command("log", "90")
+        self.assertEqual(self.run_command("log", "0")[0], 1)
+
+        store = TaskStore(self.db)
+        totals = {task_id: seconds for task_id, _, seconds
+                  in store.session_totals()}
+        store.close()
+        self.assertEqual(totals, {1: 1500, None: 5400})
+
+        _, out, _ = self.run_command("stats", "--days", "1")
+        lines = dict(line.split("\t", 1) for line in out.splitlines())
+        self.assertEqual(lines["今日"], "1時間55分")
+        self.assertEqual(lines["連続日数"], "1日 (最長 1日)")
+        _, out, _ = self.run_command("stats", "--task", "英単語")
+        self.assertIn("合計\t0時間25分", out.splitlines())
+
+    def test_does_not_load_qt(self):
+        # シェルのフックから呼んでもすぐ終わるよう、Qt は読み込まない
+        code = ("import sys, taskmanager; "
+                f"taskmanager.main(['--db', {self.db!r}, 'list']); "
+                "sys.exit(any(name.startswith('PyQt') for name in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", code], cwd=SRC)
+        self.assertEqual(result.returncode, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
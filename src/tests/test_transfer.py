@@ -0,0 +1,69 @@
+"""
+storage.transfer の書き出し・取り込みを確かめる。
+
+    cd src && python -m unittest tests.test_transfer
+"""
+import unittest
+
+from storage import TaskStore
+from storage.transfer import FIELDS, export_rows, import_rows
+
+
+def records(store, kind):
+    """書き出した行を、取り込みに渡す辞書にする"""
+    return [dict(zip(FIELDS[kind], row)) for row in export_rows(store, kind)]
+
+
+class TransferTest(unittest.TestCase):
+    def setUp(self):
+        self.source = TaskStore(":memory:")
+        first = self.source.add_task("問題集", "urgent_important", "[数学] 3章")
+        second = self.source.add_task("英単語", checked=True)
+        self.source.record_session(first, 1500, end=1_700_000_000)
+        self.source.record_session(second, 600, end=1_700_090_000)
+        self.source.record_session(None, 300, end=1_700_090_000)
+        self.target = TaskStore(":memory:")
+
+    def tearDown(self):
+        self.source.close()
+        self.target.close()
+
+    def test_round_trip(self):
+        for kind in ("tasks", "sessions"):
+            import_rows(self.target, kind, records(self.source, kind),
+                        batch_size=2)
+        self.assertEqual(self.target.load_tasks(), self.source.load_tasks())
+        self.assertEqual(sorted(map(tuple, self.target.session_totals()),
+                                key=repr),
+                         sorted(map(tuple, self.source.session_totals()),
+                                key=repr))
+
+    def test_importing_twice_does_not_duplicate(self):
+        for _ in range(2):
+            for kind in ("tasks", "sessions"):
+                import_rows(self.target, kind, records(self.source, kind))
+        self.assertEqual(len(self.target.load_tasks()), 2)
+        self.assertEqual(
+            list(export_rows(self.target, "sessions")),
+            list(export_rows(self.source, "sessions")))
+
+    def test_daily_adds_totals(self):
+        count = import_rows(self.target, "daily",
+                            records(self.source, "daily"))
+        self.assertEqual(count, 3)
+        self.assertEqual(list(export_rows(self.target, "daily")),
+                         list(export_rows(self.source, "daily")))
+
+    def test_csv_values(self):
+        # CSV から読むと値は全部文字列で、空欄は None の代わり
+        import_rows(self.target, "tasks", [
+            {"id": "", "position": "", "text": "追加", "detail": "",
+             "checked": "true", "urgency": ""},
+        ])
+        [task] = self.target.load_tasks()
+        self.assertTrue(task["checked"])
+        self.assertEqual(task["urgency"], "normal")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import bisect
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+
+# 象限の並び（左上・右上・左下・右下）。これ以外の緊急度は右下に入れる
+QUADRANTS = (
+    "urgent_important",          # 🔥 緊急×重要
+    "urgent_not_important",      # ⚡ 緊急×非重要
+    "not_urgent_important",      # 💡 非緊急×重要
+    "not_urgent_not_important",  # 📝 非緊急×非重要
+)
+
+
+def quadrant_of(task):
+    """タスクを表示する象限の番号を返す。完了済みなら None"""
+    if task is None or task["checked"]:
+        return None
+    if task["urgency"] in QUADRANTS[:3]:
+        return QUADRANTS.index(task["urgency"])
+    return 3
+
+
+class QuadrantModel(QAbstractListModel):
+    """
+    マトリックスの1象限に入るタスクの一覧。
+    行は task_id の昇順（= 追加した順）に保ち、出入りしたタスクだけを
+    二分探索で挿入・削除するので、表示中のスクロール位置や選択が崩れない。
+    """
+    TaskIdRole = Qt.ItemDataRole.UserRole
+
+    def __init__(self, repository, parent=None):
+        super().__init__(parent)
+        self.repository = repository
+        self._ids = []
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._ids)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        task_id = self._ids[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            # 削除されたがまだ反映していないタスクは空欄にしておく
+            task = self.repository.get(task_id)
+            return task["text"] if task else None
+        if role == self.TaskIdRole:
+            return task_id
+        return None
+
+    def _row_of(self, task_id):
+        row = bisect.bisect_left(self._ids, task_id)
+        if row < len(self._ids) and self._ids[row] == task_id:
+            return row
+        return -1
+
+    def reset(self, task_ids):
+        """一覧をまるごと入れ替える"""
+        self.beginResetModel()
+        self._ids = sorted(task_ids)
+        self.endResetModel()
+
+    def insert(self, task_id):
+        row = bisect.bisect_left(self._ids, task_id)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._ids.insert(row, task_id)
+        self.endInsertRows()
+
+    def remove(self, task_id):
+        row = self._row_of(task_id)
+        if row < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._ids[row]
+        self.endRemoveRows()
+
+    def refresh(self, task_id):
+        """名前が変わった行を描き直してもらう"""
+        row = self._row_of(task_id)
+        if row < 0:
+            return
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
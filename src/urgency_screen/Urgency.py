@@ -1,14 +1,30 @@
 from PyQt6.QtWidgets import (QVBoxLayout, QLabel, QWidget, QGridLayout,
-                             QListWidget
+                             QListView
                              )
-from PyQt6.QtCore import Qt, QSettings
+from PyQt6.QtCore import Qt
+
+from repository import get_repository
+from .QuadrantModel import QuadrantModel, quadrant_of
 
 
 class UrgencyWidget(QWidget):
     def __init__(self):
         super().__init__()
-        task_settings = QSettings("CHU1PC", "TaskManagerApp")
-        self.stored_tasks = task_settings.value("tasks", [])
+        self.repository = get_repository()
+
+        # 象限ごとのモデルと、task_id -> 今表示している象限の番号
+        self.quadrant_models = [QuadrantModel(self.repository, self)
+                                for _ in range(4)]
+        self._quadrants = {}
+
+        # 前回表示してから変わったタスクの id。表示するときにまとめて反映する
+        # （表示中に変わったものはすぐに反映する）
+        self._pending = set()
+        self._needs_reset = True
+        self.repository.task_added.connect(self._mark_pending)
+        self.repository.task_changed.connect(self._on_task_changed)
+        self.repository.task_removed.connect(self._mark_pending)
+        self.repository.tasks_reordered.connect(self._mark_reset)
 
         # タスクリストウィジェットを属性として保持
         self.top_left_list = None
@@ -77,9 +93,8 @@ class UrgencyWidget(QWidget):
         """)
         self.bottom_right.addWidget(urgen_low_impo_low)
 
-        # タスクリストを作成（一度だけ）
+        # タスクリストを作成（一度だけ）。振り分けは表示されたときに showEvent で行う
         self._create_task_lists()
-        self._update_tasks()
 
         main_layout.addLayout(self.top_left, 0, 0)
         main_layout.addLayout(self.top_right, 0, 1)
@@ -89,49 +104,83 @@ class UrgencyWidget(QWidget):
     def _create_task_lists(self):
         """タスクリストウィジェットを作成（一度だけ実行）"""
         if not self.top_left_list:
-            self.top_left_list = QListWidget()
+            self.top_left_list = self._create_list(0)
             self.top_left.addWidget(self.top_left_list)
 
         if not self.top_right_list:
-            self.top_right_list = QListWidget()
+            self.top_right_list = self._create_list(1)
             self.top_right.addWidget(self.top_right_list)
 
         if not self.bottom_left_list:
-            self.bottom_left_list = QListWidget()
+            self.bottom_left_list = self._create_list(2)
             self.bottom_left.addWidget(self.bottom_left_list)
 
         if not self.bottom_right_list:
-            self.bottom_right_list = QListWidget()
+            self.bottom_right_list = self._create_list(3)
             self.bottom_right.addWidget(self.bottom_right_list)
 
-    def _update_tasks(self):
-        """タスクの内容のみを更新"""
-        # 既存の内容をクリア
-        self.top_left_list.clear()
-        self.top_right_list.clear()
-        self.bottom_left_list.clear()
-        self.bottom_right_list.clear()
-
-        # 最新のタスクデータを取得
-        task_settings = QSettings("CHU1PC", "TaskManagerApp")
-        self.stored_tasks = task_settings.value("tasks", [])
-
-        # タスクを分類して追加
-        for task_entry in self.stored_tasks:
-            task_text = task_entry.get("text", "")
-            task_label = task_entry.get("urgency", "")
-            if task_entry.get("checked", False):
+    def _create_list(self, quadrant):
+        task_list = QListView()
+        task_list.setModel(self.quadrant_models[quadrant])
+        # 全行同じ高さにしておくと大量のタスクでも描画が軽い
+        task_list.setUniformItemSizes(True)
+        return task_list
+
+    def _reset_tasks(self):
+        """全タスクを象限に振り分け直す（読み直したときだけ）"""
+        self._quadrants = {}
+        members = [[] for _ in self.quadrant_models]
+        for task in self.repository.tasks():
+            quadrant = quadrant_of(task)
+            if quadrant is not None:
+                self._quadrants[task["id"]] = quadrant
+                members[quadrant].append(task["id"])
+        for model, task_ids in zip(self.quadrant_models, members):
+            model.reset(task_ids)
+
+    def _apply_pending(self):
+        """前回表示してから変わったタスクだけを象限に出し入れする"""
+        for task_id in self._pending:
+            old = self._quadrants.get(task_id)
+            new = quadrant_of(self.repository.get(task_id))
+            if old == new:
+                if new is not None:
+                    self.quadrant_models[new].refresh(task_id)
                 continue
-
-            if task_label == "urgent_important":
-                self.top_left_list.addItem(task_text)
-            elif task_label == "urgent_not_important":
-                self.top_right_list.addItem(task_text)
-            elif task_label == "not_urgent_important":
-                self.bottom_left_list.addItem(task_text)
-            else:
-                self.bottom_right_list.addItem(task_text)
+            if old is not None:
+                self.quadrant_models[old].remove(task_id)
+                del self._quadrants[task_id]
+            if new is not None:
+                self.quadrant_models[new].insert(task_id)
+                self._quadrants[task_id] = new
+
+    def _mark_pending(self, task_id):
+        self._pending.add(task_id)
+        self._refresh_if_visible()
+
+    def _mark_reset(self):
+        self._needs_reset = True
+        self._refresh_if_visible()
+
+    def _on_task_changed(self, task_id, fields):
+        # 詳細の変更はマトリックスの表示に関係ない
+        if {"text", "checked", "urgency"} & set(fields):
+            self._mark_pending(task_id)
+
+    def _refresh_if_visible(self):
+        """表示中なら待たずに反映する（--add で渡されたタスクや読み直しなど）"""
+        if self.isVisible():
+            self.refresh_tasks()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_tasks()
 
     def refresh_tasks(self):
-        """外部から呼び出してタスクを更新"""
-        self._update_tasks()
+        """外部から呼び出してタスクを更新（変わったタスクの分だけ反映する）"""
+        if self._needs_reset:
+            self._reset_tasks()
+        else:
+            self._apply_pending()
+        self._needs_reset = False
+        self._pending = set()
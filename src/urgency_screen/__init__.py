@@ -1 +1,2 @@
-from .Urgency import UrgencyWidget  # type: ignore # noqa
\ No newline at end of file
+from .Urgency import UrgencyWidget  # type: ignore # noqa
+from .QuadrantModel import QuadrantModel  # type: ignore # noqa
\ No newline at end of file
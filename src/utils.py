@@ -10,3 +10,9 @@ def resource_path(rel_path: str) -> str:
     # onefile のときは _MEIPASS、一方 onedir や普通の実行時はスクリプトのある場所
     base_path = getattr(sys, "_MEIPASS", os.path.dirname(__file__))
     return os.path.join(base_path, rel_path)
+
+
+def format_seconds(seconds):
+    """秒を「x時間yy分」にする"""
+    minutes = int(seconds) // 60
+    return f"{minutes // 60}時間{minutes % 60:02d}分"